@@ -1,3 +1,6 @@
+-- Trigram matching for English gloss search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Core table for dictionary entries
 CREATE TABLE entries (
     id TEXT PRIMARY KEY,  -- Using the JMdict ID
@@ -80,10 +83,89 @@ CREATE TABLE frequency_data (
     PRIMARY KEY (entry_id, source)
 );
 
+-- Last ingested version of each frequency corpus, so unchanged files can be skipped
+CREATE TABLE frequency_sources (
+    source TEXT PRIMARY KEY,
+    filename TEXT,
+    checksum TEXT NOT NULL,  -- SHA-256 of the source file
+    row_count INTEGER,
+    matcher TEXT,  -- how words were matched to entries (frequency_matcher.matcher_key)
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Kanji ranks loaded from kanji_freq_report.txt
+CREATE TABLE kanji_frequency (
+    kanji TEXT PRIMARY KEY,
+    count BIGINT NOT NULL,
+    rank INTEGER NOT NULL,
+    dense_rank INTEGER,
+    coverage NUMERIC  -- cumulative percent of the corpus covered up to this kanji
+);
+
+-- Per-entry kanji difficulty over its kanji writing forms, refreshed by the importer
+CREATE TABLE kanji_difficulty (
+    entry_id TEXT PRIMARY KEY REFERENCES entries(id),
+    max_rank INTEGER NOT NULL,
+    mean_rank REAL NOT NULL,
+    kanji_count INTEGER NOT NULL
+);
+
+-- Progress of the entry-by-entry importer, so an interrupted import can resume
+CREATE TABLE import_checkpoints (
+    filename TEXT PRIMARY KEY,  -- absolute path:size:mtime, see import_checkpoint.checkpoint_key
+    file_size BIGINT NOT NULL,
+    entries_done INTEGER NOT NULL,  -- entries committed so far, in file order
+    last_entry_id TEXT,
+    completed BOOLEAN NOT NULL DEFAULT FALSE,
+    started_at TIMESTAMP NOT NULL DEFAULT now(),
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Batches committed by the parallel importer, so an interrupted load only redoes missing batches
+CREATE TABLE import_batches (
+    filename TEXT NOT NULL,  -- same key as import_checkpoints
+    batch_no INTEGER NOT NULL,
+    batch_size INTEGER NOT NULL,
+    base_sense_id INTEGER NOT NULL,  -- first sense ID of the whole load; batch ranges follow from it
+    committed_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (filename, batch_no)
+);
+
+-- Hash of each entry's normalized JSON, so a new JMdict release can be applied as a diff
+CREATE TABLE entry_fingerprints (
+    entry_id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Bumped by every import and frequency update; cached lookups in other processes poll it
+CREATE TABLE dictionary_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),  -- single row
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Precomputed pool of common verbs for the quiz, rebuilt by the importer
+CREATE TABLE quiz_verbs (
+    slot INTEGER PRIMARY KEY,  -- dense 1..N so random rows can be picked by slot
+    entry_id TEXT NOT NULL UNIQUE,
+    kanji TEXT,
+    kana TEXT NOT NULL,
+    verb_type TEXT NOT NULL,
+    te_kanji TEXT,
+    te_kana TEXT NOT NULL,
+    frequency_rank INTEGER,
+    weight DOUBLE PRECISION NOT NULL,  -- corpus frequency, used for weighted quiz draws
+    cumulative_weight DOUBLE PRECISION NOT NULL  -- running total of weight in slot order
+);
+
 CREATE INDEX IF NOT EXISTS idx_writing_forms_text ON writing_forms(form_text);
 CREATE INDEX IF NOT EXISTS idx_senses_entry_id ON senses(entry_id);
 CREATE INDEX IF NOT EXISTS idx_glosses_sense_id ON glosses(sense_id);
 CREATE INDEX IF NOT EXISTS idx_examples_entry_id ON examples(entry_id);
 CREATE INDEX IF NOT EXISTS idx_conjugations_entry_id ON conjugations(entry_id);
 CREATE INDEX IF NOT EXISTS idx_word_relationships_entry_id ON word_relationships(entry_id);
-CREATE INDEX IF NOT EXISTS frequency_rank_idx ON frequency_data(frequency);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS frequency_rank_idx ON frequency_data(frequency);
+CREATE INDEX IF NOT EXISTS idx_quiz_verbs_cumulative_weight ON quiz_verbs(cumulative_weight);
+CREATE INDEX IF NOT EXISTS idx_kanji_difficulty_max_rank ON kanji_difficulty(max_rank);
+CREATE INDEX IF NOT EXISTS idx_glosses_gloss_trgm ON glosses USING gin (gloss gin_trgm_ops);
\ No newline at end of file
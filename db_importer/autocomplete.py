@@ -0,0 +1,84 @@
+import heapq
+import sys
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Sorts after every real character, so prefix + _MAX_CHAR bounds a prefix range
+_MAX_CHAR = '\U0010ffff'
+_NO_RANK = sys.maxsize
+
+AUTOCOMPLETE_QUERY = """
+    SELECT wf.form_text, wf.entry_id, wf.is_common, fr.best_rank
+    FROM writing_forms wf
+    LEFT JOIN (
+        SELECT entry_id, MIN(rank) as best_rank
+        FROM frequency_data
+        GROUP BY entry_id
+    ) fr ON fr.entry_id = wf.entry_id
+"""
+
+class AutocompleteIndex:
+    """Prefix completion over all kanji and kana writing forms.
+
+    Forms are kept in one sorted array, so the completions of a prefix
+    are a contiguous slice found with two binary searches. Completions
+    are ordered common forms first, then by best frequency rank, then
+    shorter forms. The top-k for every prefix up to `precompute_length`
+    characters, whose slices are the largest, is computed at build time.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, bool, Optional[int]]],
+                 precompute_length: int = 2, precompute_k: int = 20):
+        self.precompute_length = precompute_length
+        self.precompute_k = precompute_k
+
+        # Keep the best-scoring entry for each distinct form text
+        best: Dict[str, Tuple[tuple, str, bool, Optional[int]]] = {}
+        for text, entry_id, is_common, rank in rows:
+            if not text:
+                continue
+            score = (not is_common, rank if rank is not None else _NO_RANK, len(text), text)
+            current = best.get(text)
+            if current is None or score < current[0]:
+                best[text] = (score, entry_id, bool(is_common), rank)
+
+        self.forms: List[str] = sorted(best)
+        self.scores: List[tuple] = [best[text][0] for text in self.forms]
+        self.entries: List[Tuple[str, bool, Optional[int]]] = [best[text][1:] for text in self.forms]
+        self._top: Dict[str, List[int]] = self._precompute()
+
+    def __len__(self) -> int:
+        return len(self.forms)
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        return bisect_left(self.forms, prefix), bisect_left(self.forms, prefix + _MAX_CHAR)
+
+    def _best(self, start: int, end: int, k: int) -> List[int]:
+        scores = self.scores
+        return heapq.nsmallest(k, range(start, end), key=scores.__getitem__)
+
+    def _precompute(self) -> Dict[str, List[int]]:
+        prefixes = {form[:length] for form in self.forms
+                    for length in range(1, min(len(form), self.precompute_length) + 1)}
+        return {prefix: self._best(*self._range(prefix), self.precompute_k) for prefix in prefixes}
+
+    def _result(self, index: int) -> Dict[str, Any]:
+        entry_id, is_common, rank = self.entries[index]
+        return {'text': self.forms[index], 'entry_id': entry_id, 'is_common': is_common, 'rank': rank}
+
+    def complete(self, prefix: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Return the top-k writing forms starting with prefix."""
+        if not prefix or k <= 0:
+            return []
+        if len(prefix) <= self.precompute_length and k <= self.precompute_k:
+            indices = self._top.get(prefix, [])[:k]
+        else:
+            indices = self._best(*self._range(prefix), k)
+        return [self._result(i) for i in indices]
+
+    @classmethod
+    def from_database(cls, conn, **kwargs) -> 'AutocompleteIndex':
+        """Build the index from writing_forms ranked by frequency_data."""
+        with conn.cursor() as cur:
+            cur.execute(AUTOCOMPLETE_QUERY)
+            return cls(cur.fetchall(), **kwargs)
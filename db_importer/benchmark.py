@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from japanese_conjugator import JapaneseConjugator, process_dictionary_entry
+from jmdict_reader import iter_entries
+
+# (kanji, kana, type) seeds for the synthetic corpus, one or more per supported type
+SAMPLE_WORDS = (
+    ('書く', 'かく', 'v5k'), ('泳ぐ', 'およぐ', 'v5g'), ('話す', 'はなす', 'v5s'),
+    ('待つ', 'まつ', 'v5t'), ('死ぬ', 'しぬ', 'v5n'), ('遊ぶ', 'あそぶ', 'v5b'),
+    ('読む', 'よむ', 'v5m'), ('帰る', 'かえる', 'v5r'), ('買う', 'かう', 'v5u'),
+    ('食べる', 'たべる', 'v1'), ('見る', 'みる', 'v1'), ('来る', 'くる', 'vk'),
+    ('高い', 'たかい', 'adj-i'), ('新しい', 'あたらしい', 'adj-i'),
+    ('静か', 'しずか', 'adj-na'), ('綺麗', 'きれい', 'adj-na'),
+)
+
+SUITES = ('conjugator', 'import', 'frequency', 'lookup')
+
+class SkipSuite(Exception):
+    """Raised by a suite that cannot run here (e.g. no database)."""
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(timings_ns: List[int]) -> Dict[str, Any]:
+    """Per-call latency statistics in microseconds."""
+    values = sorted(t / 1000.0 for t in timings_ns)
+    return {
+        'unit': 'us',
+        'count': len(values),
+        'mean': sum(values) / len(values),
+        'min': values[0],
+        'p50': percentile(values, 50),
+        'p90': percentile(values, 90),
+        'p99': percentile(values, 99),
+        'max': values[-1]
+    }
+
+def measure(func: Callable[[Any], Any], inputs: Iterable[Any], warmup: int = 10) -> Dict[str, Any]:
+    """Time func on each input separately, after a few untimed warm-up calls."""
+    inputs = list(inputs)
+    for value in inputs[:warmup]:
+        func(value)
+    timings = []
+    clock = time.perf_counter_ns
+    for value in inputs:
+        start = clock()
+        func(value)
+        timings.append(clock() - start)
+    return summarize(timings)
+
+def synthetic_entries(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """JMdict-shaped entries cycling through SAMPLE_WORDS, with unique ids."""
+    entries = []
+    for i in range(count):
+        kanji, kana, word_type = SAMPLE_WORDS[rng.randrange(len(SAMPLE_WORDS))]
+        entries.append({
+            'id': f'bench-{i}',
+            'kanji': [{'text': kanji, 'common': True}],
+            'kana': [{'text': kana, 'common': True}],
+            'sense': [{
+                'partOfSpeech': [word_type],
+                'field': [],
+                'gloss': [{'text': f'benchmark gloss {i}', 'lang': 'eng'}],
+                'examples': []
+            }]
+        })
+    return entries
+
+def sample_entries(filename: str, count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Reservoir-sample entries from a JMdict file, reproducibly for a given seed."""
+    sample = []
+    for i, entry in enumerate(iter_entries(filename)):
+        if i < count:
+            sample.append(entry)
+        else:
+            j = rng.randint(0, i)
+            if j < count:
+                sample[j] = entry
+    return sample
+
+def bench_conjugator(args, rng: random.Random, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    conjugator = JapaneseConjugator()
+    verbs = [w for w in SAMPLE_WORDS if not w[2].startswith('adj')]
+    adjectives = [w for w in SAMPLE_WORDS if w[2].startswith('adj')]
+    n = args.iterations
+    return {
+        'conjugate_verb': measure(lambda w: conjugator.conjugate_verb(*w),
+                                  [verbs[rng.randrange(len(verbs))] for _ in range(n)]),
+        'conjugate_adjective': measure(lambda w: conjugator.conjugate_adjective(*w),
+                                       [adjectives[rng.randrange(len(adjectives))] for _ in range(n)]),
+        'process_dictionary_entry': measure(process_dictionary_entry, entries),
+        'process_dictionary_entry_compact': measure(lambda e: process_dictionary_entry(e, compact=True), entries),
+    }
+
+def _connect():
+    """Check out a pooled connection to the configured database, or skip the suite."""
+    try:
+        from db_pool import db_params_from_env, get_pool
+        pool = get_pool(db_params_from_env())
+        return pool, pool.getconn(timeout=5)
+    except Exception as e:
+        raise SkipSuite(f"database unavailable: {e}")
+
+def bench_import(args, rng: random.Random, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    pool, conn = _connect()
+    from import_data import process_entry
+    try:
+        with conn.cursor() as cur:
+            # Fresh ids so entries are really inserted; everything is rolled back afterwards
+            run_entries = [dict(entry, id=f"bench-{rng.getrandbits(48):x}-{i}")
+                           for i, entry in enumerate(entries)]
+            return {'process_entry': measure(lambda e: process_entry(e, cur), run_entries, warmup=0)}
+    finally:
+        conn.rollback()
+        pool.putconn(conn)
+
+def bench_frequency(args, rng: random.Random, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if not args.allow_writes:
+        raise SkipSuite("update_frequencies rewrites frequency_data; pass --allow-writes on a scratch database")
+    if not args.frequency_report:
+        raise SkipSuite("no --frequency-report given")
+    pool, conn = _connect()
+    pool.putconn(conn)
+    from import_frequency import FrequencyUpdater
+    with FrequencyUpdater() as updater:
+        frequency_data = updater.read_frequency_data(args.frequency_report)
+        # Each run replaces the whole source, so a few repetitions are enough
+        return {'update_frequencies': measure(updater.update_frequencies,
+                                              [frequency_data] * args.repeat_writes, warmup=1)}
+
+def bench_lookup(args, rng: random.Random, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    pool, conn = _connect()
+    from query_db import JapaneseDictionary
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT setseed(%s)", (rng.random() * 2 - 1,))
+            cur.execute("SELECT form_text FROM writing_forms ORDER BY random() LIMIT %s", (args.iterations,))
+            words = [row[0] for row in cur.fetchall()]
+            cur.execute("""
+                SELECT split_part(gloss, ' ', 1) FROM glosses
+                WHERE length(gloss) > 3 ORDER BY random() LIMIT %s
+            """, (args.iterations,))
+            meanings = [row[0] for row in cur.fetchall()]
+        conn.rollback()
+    finally:
+        pool.putconn(conn)
+    if not words:
+        raise SkipSuite("dictionary tables are empty")
+
+    dictionary = JapaneseDictionary(pool)
+    return {
+        'lookup_word': measure(dictionary.lookup_word, words),
+        'search_by_meaning': measure(dictionary.search_by_meaning, meanings),
+    }
+
+BENCHMARKS = {
+    'conjugator': bench_conjugator,
+    'import': bench_import,
+    'frequency': bench_frequency,
+    'lookup': bench_lookup,
+}
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """List the benchmarks whose p50 grew by more than `threshold` times the baseline."""
+    regressions = []
+    for suite, benchmarks in results['suites'].items():
+        for name, stats in benchmarks.items():
+            old = baseline.get('suites', {}).get(suite, {}).get(name)
+            if old and stats['p50'] > old['p50'] * threshold:
+                regressions.append(f"{suite}.{name}: p50 {old['p50']:.1f}us -> {stats['p50']:.1f}us")
+    return regressions
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the conjugator, importer and lookup hot paths")
+    parser.add_argument('--suites', default=','.join(SUITES),
+                        help=f"Comma-separated suites to run ({', '.join(SUITES)})")
+    parser.add_argument('--iterations', type=int, default=1000, help="Timed calls per benchmark")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for sampling and synthetic data")
+    parser.add_argument('--jmdict', help="Sample entries from this JMdict file instead of synthetic ones")
+    parser.add_argument('--frequency-report', help="Word frequency report for the frequency suite")
+    parser.add_argument('--allow-writes', action='store_true',
+                        help="Run suites that commit to the database (frequency)")
+    parser.add_argument('--repeat-writes', type=int, default=3, help="Timed runs of update_frequencies")
+    parser.add_argument('--output', default='benchmark_results.json', help="Where to write the JSON results")
+    parser.add_argument('--baseline', help="Earlier results to compare against")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="Fail when a p50 exceeds the baseline by this factor")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    if args.jmdict:
+        entries = sample_entries(args.jmdict, args.iterations, rng)
+    else:
+        entries = synthetic_entries(args.iterations, rng)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'iterations': args.iterations,
+            'corpus': args.jmdict or 'synthetic'
+        },
+        'suites': {},
+        'skipped': {}
+    }
+    for suite in args.suites.split(','):
+        suite = suite.strip()
+        if suite not in BENCHMARKS:
+            raise SystemExit(f"Unknown suite {suite!r}; choose from {', '.join(SUITES)}")
+        print(f"Running {suite}...")
+        try:
+            # Each suite gets its own stream so adding one doesn't change the others' samples
+            results['suites'][suite] = BENCHMARKS[suite](args, random.Random(f"{args.seed}-{suite}"), entries)
+        except SkipSuite as e:
+            results['skipped'][suite] = str(e)
+            print(f"  skipped: {e}")
+            continue
+        for name, stats in results['suites'][suite].items():
+            print(f"  {name}: p50 {stats['p50']:.1f}us  p90 {stats['p90']:.1f}us  p99 {stats['p99']:.1f}us")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import io
+from entry_rows import entry_is_common, writing_form_rows, example_rows, conjugation_rows
+from entry_fingerprints import entry_fingerprint, reset_fingerprints
+from jmdict_reader import iter_entries
+from typing import Dict, List, Any, Optional, Tuple
+
+# Columns loaded for each table, in foreign key order (parents first)
+COPY_COLUMNS = {
+    'entries': ('id', 'is_common'),
+    'writing_forms': ('entry_id', 'form_text', 'form_type', 'is_common'),
+    'senses': ('id', 'entry_id', 'sense_order'),
+    'sense_pos': ('sense_id', 'pos'),
+    'sense_fields': ('sense_id', 'field'),
+    'glosses': ('sense_id', 'gloss', 'lang'),
+    'examples': ('entry_id', 'japanese', 'english'),
+    'conjugations': ('entry_id', 'conjugation_type', 'form', 'kanji', 'kana'),
+    # Lets a later --diff import skip entries unchanged since this load
+    'entry_fingerprints': ('entry_id', 'fingerprint'),
+}
+
+# Escapes required by the COPY text format
+_COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+def copy_line(row: Tuple) -> str:
+    """Format a row as a line of COPY text format."""
+    values = []
+    for value in row:
+        if value is None:
+            values.append('\\N')
+        elif value is True:
+            values.append('t')
+        elif value is False:
+            values.append('f')
+        else:
+            values.append(str(value).translate(_COPY_ESCAPES))
+    return '\t'.join(values) + '\n'
+
+def next_sense_id(cur) -> int:
+    """Get the first sense ID not yet used in the senses table."""
+    cur.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM senses")
+    return cur.fetchone()[0]
+
+def sync_sense_sequence(cur) -> None:
+    """Move the senses id sequence past any locally assigned IDs."""
+    cur.execute("""
+        SELECT setval(pg_get_serial_sequence('senses', 'id'), COALESCE(MAX(id), 0) + 1, false)
+        FROM senses
+    """)
+
+class BulkLoader:
+    """Buffer dictionary rows client-side and load them with COPY FROM STDIN.
+
+    Sense IDs are assigned locally so no per-row round trips are needed.
+    COPY cannot skip conflicting rows, so this expects the dictionary
+    tables to be empty (or at least not to contain the entries loaded).
+    entry_fingerprints must exist and be empty (see reset_fingerprints).
+    """
+
+    def __init__(self, conn, first_sense_id: Optional[int] = None, batch_rows: int = 200000):
+        self.conn = conn
+        self.batch_rows = batch_rows
+        self.buffers: Dict[str, List[str]] = {table: [] for table in COPY_COLUMNS}
+        self.row_counts: Dict[str, int] = {table: 0 for table in COPY_COLUMNS}
+        self.buffered_rows = 0
+        if first_sense_id is None:
+            with conn.cursor() as cur:
+                first_sense_id = next_sense_id(cur)
+        self.sense_id = first_sense_id
+
+    def _add(self, table: str, rows: List[Tuple]) -> None:
+        self.buffers[table].extend(copy_line(row) for row in rows)
+        self.buffered_rows += len(rows)
+
+    def add_entry(self, entry: Dict[str, Any]) -> None:
+        """Buffer all rows for a dictionary entry, flushing when the batch is full."""
+        entry_id = entry['id']
+        self._add('entries', [(entry_id, entry_is_common(entry))])
+        self._add('entry_fingerprints', [(entry_id, entry_fingerprint(entry))])
+
+        # The primary key covers (entry_id, form_text, form_type), so drop repeats
+        self._add('writing_forms', list({row[:3]: row for row in writing_form_rows(entry)}.values()))
+
+        for sense_idx, sense in enumerate(entry.get('sense', []), 1):
+            sense_id = self.sense_id
+            self.sense_id += 1
+            self._add('senses', [(sense_id, entry_id, sense_idx)])
+            self._add('sense_pos', [(sense_id, pos) for pos in dict.fromkeys(sense.get('partOfSpeech', []))])
+            self._add('sense_fields', [(sense_id, field) for field in dict.fromkeys(sense.get('field', []))])
+            self._add('glosses', [(sense_id, gloss['text'], gloss.get('lang', 'eng'))
+                                  for gloss in sense.get('gloss', [])])
+            self._add('examples', example_rows(entry_id, sense))
+
+        self._add('conjugations', conjugation_rows(entry))
+
+        if self.buffered_rows >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Send every buffered table to the server through COPY."""
+        with self.conn.cursor() as cur:
+            for table, columns in COPY_COLUMNS.items():
+                lines = self.buffers[table]
+                if not lines:
+                    continue
+                cur.copy_expert(
+                    f"COPY {table} ({', '.join(columns)}) FROM STDIN",
+                    io.StringIO(''.join(lines))
+                )
+                self.row_counts[table] += len(lines)
+                lines.clear()
+        self.buffered_rows = 0
+
+    def finish(self) -> Dict[str, int]:
+        """Flush remaining rows, sync the senses sequence and return row counts."""
+        self.flush()
+        with self.conn.cursor() as cur:
+            sync_sense_sequence(cur)
+        return self.row_counts
+
+def bulk_import(conn, filename: str) -> Dict[str, int]:
+    """Import a JMdict file through COPY and commit once at the end.
+
+    Expects empty dictionary tables; stored entry fingerprints are replaced.
+    """
+    with conn.cursor() as cur:
+        reset_fingerprints(cur)
+    loader = BulkLoader(conn)
+    for i, entry in enumerate(iter_entries(filename), 1):
+        loader.add_entry(entry)
+        if i % 10000 == 0:
+            print(f"Buffered entry {i}")
+    row_counts = loader.finish()
+    conn.commit()
+    return row_counts
@@ -1,4 +1,5 @@
 import psycopg2
+from db_pool import get_pool
 
 def create_tables():
     # Database connection parameters
@@ -48,7 +49,8 @@ def create_tables():
     ]
 
     try:
-        conn = psycopg2.connect(**db_params)
+        pool = get_pool(db_params)
+        conn = pool.getconn()
         cur = conn.cursor()
 
         # Create each table
@@ -65,7 +67,7 @@ def create_tables():
         if 'cur' in locals():
             cur.close()
         if 'conn' in locals():
-            conn.close()
+            pool.putconn(conn)
 
 if __name__ == "__main__":
     create_tables()
\ No newline at end of file
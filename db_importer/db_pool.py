@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+import psycopg2
+import psycopg2.extensions
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def db_params_from_env() -> dict:
+    """Database connection parameters from environment variables."""
+    return {
+        'dbname': os.getenv('DB_NAME'),
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'host': os.getenv('DB_HOST'),
+        'port': os.getenv('DB_PORT', '5432')
+    }
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the wait timeout."""
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool.
+
+    Callers block (up to `timeout`) when all `maxconn` connections are in
+    use. Connections idle longer than `idle_timeout` are closed down to
+    `minconn`, and a connection idle longer than `health_check_after` is
+    pinged with SELECT 1 before it is handed out.
+    """
+
+    def __init__(self, db_params: dict, minconn: int = 1, maxconn: int = 10,
+                 idle_timeout: float = 300.0, health_check_after: float = 30.0,
+                 timeout: Optional[float] = 30.0):
+        self.db_params = db_params
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.timeout = timeout
+        self.pid = os.getpid()
+
+        self._idle = deque()  # (connection, returned_at), most recently used last
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        # Reentrant, so the counters can be updated from code already holding it
+        self._cond = threading.Condition(threading.RLock())
+
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts = 0
+        self.health_check_failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.db_params)
+        with self._cond:
+            self.connections_created += 1
+        return conn
+
+    def _close(self, conn) -> None:
+        try:
+            conn.close()
+        finally:
+            with self._cond:
+                self.connections_closed += 1
+
+    def _prune_idle(self, now: float) -> None:
+        """Close the oldest idle connections past the idle timeout, keeping minconn open."""
+        while (self._idle and self._size > self.minconn
+               and now - self._idle[0][1] > self.idle_timeout):
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._close(conn)
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            with self._cond:
+                self.health_check_failures += 1
+            return False
+
+    def getconn(self, timeout: Optional[float] = None):
+        """Check out a connection, waiting for one to be returned if the pool is full."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._prune_idle(now)
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._size < self.maxconn:
+                    # Reserve the slot; the connection is opened outside the lock
+                    self._size += 1
+                    conn, returned_at = None, now
+                    break
+                if deadline is not None and now >= deadline:
+                    raise PoolTimeout(f"No connection available within {timeout}s")
+                self._waiting += 1
+                try:
+                    self._cond.wait(None if deadline is None else deadline - now)
+                finally:
+                    self._waiting -= 1
+            self._in_use += 1
+
+        try:
+            if conn is None:
+                conn = self._connect()
+            elif time.monotonic() - returned_at > self.health_check_after and not self._is_healthy(conn):
+                self._close(conn)
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return conn
+
+    def putconn(self, conn, close: bool = False) -> None:
+        """Return a connection to the pool, rolling back any open transaction."""
+        if not conn.closed and not close:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+        with self._cond:
+            self._in_use -= 1
+            if conn.closed or close:
+                self._size -= 1
+                if not conn.closed:
+                    self._close(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Check out a connection, committing on success and rolling back on error."""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.putconn(conn)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return pool size, usage and wait-time counters."""
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'waiting': self._waiting,
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+                'health_check_failures': self.health_check_failures,
+                'checkouts': self.checkouts,
+                'avg_wait': self.total_wait / self.checkouts if self.checkouts else 0.0,
+                'max_wait': self.max_wait
+            }
+
+    def closeall(self) -> None:
+        """Close all idle connections; checked-out connections are closed when returned."""
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._size -= 1
+                self._close(conn)
+
+# Shared pools keyed by connection parameters
+_pools: Dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_params: Optional[dict] = None) -> ConnectionPool:
+    """Return the shared pool for the given (or environment) connection parameters.
+
+    Pool sizes come from DB_POOL_MIN, DB_POOL_MAX and DB_POOL_IDLE_TIMEOUT.
+    A process forked from one that already had a pool gets its own.
+    """
+    db_params = db_params or db_params_from_env()
+    key = tuple(sorted(db_params.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.pid != os.getpid():
+            pool = ConnectionPool(
+                db_params,
+                minconn=int(os.getenv('DB_POOL_MIN', '1')),
+                maxconn=int(os.getenv('DB_POOL_MAX', '10')),
+                idle_timeout=float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))
+            )
+            _pools[key] = pool
+        return pool
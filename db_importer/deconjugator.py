@@ -0,0 +1,68 @@
+import sys
+from japanese_conjugator import iter_entry_forms
+from typing import Dict, List, Any, Iterable, Tuple
+
+class DeconjugationIndex:
+    """Map every conjugated surface form (kanji and kana) back to its word.
+
+    Lookups are a single hash probe on the surface text and return
+    (entry_id, conjugation_type, form) tuples, since a surface form can
+    belong to several words (e.g. かえる) or several forms of one word
+    (potential and passive of ichidan verbs).
+    """
+
+    def __init__(self):
+        self._index: Dict[str, List[Tuple[str, str, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._index
+
+    def add(self, text: str, entry_id: str, conj_type: str, form: str) -> None:
+        """Record that `text` is the given form of an entry."""
+        if not text:
+            return
+        # Interning keeps one copy of the repeated ids, type and form names
+        match = (sys.intern(entry_id), sys.intern(conj_type), sys.intern(form))
+        matches = self._index.get(text)
+        if matches is None:
+            self._index[text] = [match]
+        elif match not in matches:
+            matches.append(match)
+
+    def add_forms(self, entry_id: str, conj_type: str, forms, kanji_forms, kana_forms) -> None:
+        """Record the aligned form tuples produced by JapaneseConjugator.verb_forms/adjective_forms."""
+        for form, kanji, kana in zip(forms, kanji_forms, kana_forms):
+            self.add(kanji, entry_id, conj_type, form)
+            self.add(kana, entry_id, conj_type, form)
+
+    def add_entry(self, entry: Dict[str, Any]) -> None:
+        """Conjugate a JMdict entry and index all of its forms."""
+        for _, _, conj_type, forms, kanji_forms, kana_forms in iter_entry_forms(entry):
+            self.add_forms(entry['id'], conj_type, forms, kanji_forms, kana_forms)
+
+    def lookup(self, text: str) -> List[Tuple[str, str, str]]:
+        """Return the (entry_id, conjugation_type, form) matches for a surface form."""
+        return self._index.get(text, [])
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, Any]]) -> 'DeconjugationIndex':
+        """Build the index by conjugating JMdict entries (e.g. from jmdict_reader)."""
+        index = cls()
+        for entry in entries:
+            index.add_entry(entry)
+        return index
+
+    @classmethod
+    def from_database(cls, conn, itersize: int = 50000) -> 'DeconjugationIndex':
+        """Build the index from the conjugations table using a server-side cursor."""
+        index = cls()
+        with conn.cursor(name='deconjugation_index') as cur:
+            cur.itersize = itersize
+            cur.execute("SELECT entry_id, conjugation_type, form, kanji, kana FROM conjugations")
+            for entry_id, conj_type, form, kanji, kana in cur:
+                index.add(kanji, entry_id, conj_type, form)
+                index.add(kana, entry_id, conj_type, form)
+        return index
@@ -0,0 +1,343 @@
+import argparse
+import mmap
+import os
+import struct
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional
+
+# File layout (little-endian):
+#   header: magic, version, then (offset, count) for each section
+#   string offsets: u32[count + 1] into the string pool; string i is pool[off[i]:off[i+1]]
+#   string pool: UTF-8 bytes of every distinct string
+#   records: fixed-size structs below, referring to strings by index
+#   keys: (string, entry) pairs sorted by the string's UTF-8 bytes
+MAGIC = b'JMDSNAP1'
+VERSION = 1
+SECTIONS = ('string_offsets', 'string_pool', 'entries', 'forms', 'senses',
+            'string_lists', 'conjugations', 'examples', 'keys')
+
+HEADER = struct.Struct('<8sI4x' + 'QQ' * len(SECTIONS))
+U32 = struct.Struct('<I')
+STRING_SPAN = struct.Struct('<II')
+# id, is_common, then (start, count) into forms, senses, conjugations, examples
+ENTRY = struct.Struct('<I?3x8I')
+# text, type, is_common
+FORM = struct.Struct('<II?3x')
+# id, sense_order, then (start, count) into string_lists for pos, fields, glosses
+SENSE = struct.Struct('<II6I')
+# conjugation_type, form, kanji, kana
+CONJUGATION = struct.Struct('<4I')
+# japanese, english
+EXAMPLE = struct.Struct('<2I')
+# form text, entry index
+KEY = struct.Struct('<2I')
+
+NO_STRING = 0xFFFFFFFF
+
+class SnapshotWriter:
+    """Collect entries in the shape returned by JapaneseDictionary.lookup_word and write a snapshot."""
+
+    def __init__(self):
+        self._strings: Dict[str, int] = {}
+        self.entries: List[tuple] = []
+        self.forms: List[tuple] = []
+        self.senses: List[tuple] = []
+        self.string_lists: List[int] = []
+        self.conjugations: List[tuple] = []
+        self.examples: List[tuple] = []
+        self.keys: Dict[tuple, None] = {}
+
+    def _string(self, text: Optional[str]) -> int:
+        if text is None:
+            return NO_STRING
+        index = self._strings.get(text)
+        if index is None:
+            index = self._strings[text] = len(self._strings)
+        return index
+
+    def _string_list(self, texts: Iterable[Optional[str]]) -> tuple:
+        start = len(self.string_lists)
+        self.string_lists.extend(self._string(text) for text in texts if text is not None)
+        return start, len(self.string_lists) - start
+
+    def add_entry(self, entry: Dict[str, Any]) -> None:
+        entry_index = len(self.entries)
+        forms_start = len(self.forms)
+        for form in entry['writing_forms']:
+            text = self._string(form['text'])
+            self.forms.append((text, self._string(form['type']), bool(form['is_common'])))
+            self.keys[(text, entry_index)] = None
+
+        senses_start = len(self.senses)
+        for sense in entry['senses']:
+            self.senses.append((sense['id'], sense['sense_order'],
+                                *self._string_list(sense['pos']),
+                                *self._string_list(sense['fields']),
+                                *self._string_list(sense['glosses'])))
+
+        conjugations_start = len(self.conjugations)
+        for conjugation in entry['conjugations']:
+            self.conjugations.append((self._string(conjugation['conjugation_type']),
+                                      self._string(conjugation['form']),
+                                      self._string(conjugation['kanji']),
+                                      self._string(conjugation['kana'])))
+
+        examples_start = len(self.examples)
+        for example in entry['examples']:
+            self.examples.append((self._string(example['japanese']), self._string(example['english'])))
+
+        self.entries.append((self._string(entry['id']), bool(entry['is_common']),
+                             forms_start, len(self.forms) - forms_start,
+                             senses_start, len(self.senses) - senses_start,
+                             conjugations_start, len(self.conjugations) - conjugations_start,
+                             examples_start, len(self.examples) - examples_start))
+
+    def write(self, path: str) -> None:
+        """Write the snapshot atomically, so open readers keep their old copy."""
+        encoded = [text.encode('utf-8') for text in self._strings]
+        offsets = [0]
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        keys = sorted(self.keys, key=lambda key: (encoded[key[0]], key[1]))
+
+        sections = {
+            'string_offsets': (struct.pack(f'<{len(offsets)}I', *offsets), len(encoded)),
+            'string_pool': (b''.join(encoded), offsets[-1]),
+            'entries': (b''.join(ENTRY.pack(*row) for row in self.entries), len(self.entries)),
+            'forms': (b''.join(FORM.pack(*row) for row in self.forms), len(self.forms)),
+            'senses': (b''.join(SENSE.pack(*row) for row in self.senses), len(self.senses)),
+            'string_lists': (struct.pack(f'<{len(self.string_lists)}I', *self.string_lists),
+                             len(self.string_lists)),
+            'conjugations': (b''.join(CONJUGATION.pack(*row) for row in self.conjugations),
+                             len(self.conjugations)),
+            'examples': (b''.join(EXAMPLE.pack(*row) for row in self.examples), len(self.examples)),
+            'keys': (b''.join(KEY.pack(*row) for row in keys), len(keys)),
+        }
+
+        table = []
+        offset = HEADER.size
+        for name in SECTIONS:
+            data, count = sections[name]
+            # Keep every section 8-byte aligned
+            offset += -offset % 8
+            table.extend((offset, count))
+            offset += len(data)
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, *table))
+            for name, section_offset in zip(SECTIONS, table[::2]):
+                f.write(b'\0' * (section_offset - f.tell()))
+                f.write(sections[name][0])
+        os.replace(tmp_path, path)
+
+class DictionarySnapshot:
+    """Read-only, memory-mapped dictionary snapshot.
+
+    Nothing is deserialized up front: lookup_word binary-searches the
+    sorted key index and decodes only the records of matching entries,
+    so opening is instant and processes mapping the same file share it
+    through the page cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size or HEADER.unpack_from(self._mm, 0)[:2] != (MAGIC, VERSION):
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} dictionary snapshot")
+        table = HEADER.unpack_from(self._mm, 0)[2:]
+        self._offsets = dict(zip(SECTIONS, table[::2]))
+        self._counts = dict(zip(SECTIONS, table[1::2]))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._counts['entries']
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def _record(self, section: str, record: struct.Struct, index: int) -> tuple:
+        return record.unpack_from(self._mm, self._offsets[section] + index * record.size)
+
+    def _string_bytes(self, index: int) -> bytes:
+        start, end = STRING_SPAN.unpack_from(self._mm, self._offsets['string_offsets'] + index * 4)
+        pool = self._offsets['string_pool']
+        return self._mm[pool + start:pool + end]
+
+    def _string(self, index: int) -> Optional[str]:
+        if index == NO_STRING:
+            return None
+        return self._string_bytes(index).decode('utf-8')
+
+    def _string_list(self, start: int, count: int) -> List[str]:
+        base = self._offsets['string_lists'] + start * 4
+        return [self._string(U32.unpack_from(self._mm, base + i * 4)[0]) for i in range(count)]
+
+    def _find_entries(self, text: str) -> List[int]:
+        """Binary search the key index for all entries with this form."""
+        key = text.encode('utf-8')
+        lo, hi = 0, self._counts['keys']
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string_bytes(self._record('keys', KEY, mid)[0]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        matches = []
+        while lo < self._counts['keys']:
+            string_index, entry_index = self._record('keys', KEY, lo)
+            if self._string_bytes(string_index) != key:
+                break
+            matches.append(entry_index)
+            lo += 1
+        return matches
+
+    def _entry(self, index: int) -> Dict[str, Any]:
+        (entry_id, is_common, forms_start, forms_count, senses_start, senses_count,
+         conjugations_start, conjugations_count, examples_start, examples_count) = self._record('entries', ENTRY, index)
+
+        writing_forms = []
+        for i in range(forms_start, forms_start + forms_count):
+            text, form_type, form_common = self._record('forms', FORM, i)
+            writing_forms.append({'text': self._string(text), 'type': self._string(form_type),
+                                  'is_common': form_common})
+
+        senses = []
+        for i in range(senses_start, senses_start + senses_count):
+            sense_id, sense_order, *lists = self._record('senses', SENSE, i)
+            senses.append({
+                'id': sense_id,
+                'sense_order': sense_order,
+                'pos': self._string_list(*lists[0:2]),
+                'fields': self._string_list(*lists[2:4]),
+                'glosses': self._string_list(*lists[4:6])
+            })
+
+        conjugations = []
+        for i in range(conjugations_start, conjugations_start + conjugations_count):
+            conj_type, form, kanji, kana = self._record('conjugations', CONJUGATION, i)
+            conjugations.append({'conjugation_type': self._string(conj_type), 'form': self._string(form),
+                                 'kanji': self._string(kanji), 'kana': self._string(kana)})
+
+        examples = []
+        for i in range(examples_start, examples_start + examples_count):
+            japanese, english = self._record('examples', EXAMPLE, i)
+            examples.append({'japanese': self._string(japanese), 'english': self._string(english)})
+
+        return {
+            'id': self._string(entry_id),
+            'is_common': is_common,
+            'writing_forms': writing_forms,
+            'senses': senses,
+            'conjugations': conjugations,
+            'examples': examples
+        }
+
+    def lookup_word(self, text: str) -> Dict[str, Any]:
+        """Same result shape as JapaneseDictionary.lookup_word, without a database round trip."""
+        results = {}
+        for index in self._find_entries(text):
+            entry = self._entry(index)
+            results[entry['id']] = entry
+        return results
+
+    def lookup_words(self, texts: List[str]) -> Dict[str, Dict[str, Any]]:
+        return {text: self.lookup_word(text) for text in dict.fromkeys(texts)}
+
+# Ordered by entry id so export_snapshot can merge them; the per-entry order
+# and the code-point sorted, NULL-free sense lists match JapaneseDictionary.lookup_words
+EXPORT_QUERIES = {
+    'forms': """
+        SELECT entry_id, form_text, form_type, is_common FROM writing_forms
+        ORDER BY entry_id, form_type DESC, form_text
+    """,
+    'senses': """
+        SELECT s.entry_id, s.id, s.sense_order,
+               ARRAY(SELECT DISTINCT pos COLLATE "C" FROM sense_pos
+                     WHERE sense_id = s.id AND pos IS NOT NULL ORDER BY 1) as pos,
+               ARRAY(SELECT DISTINCT field COLLATE "C" FROM sense_fields
+                     WHERE sense_id = s.id AND field IS NOT NULL ORDER BY 1) as fields,
+               ARRAY(SELECT DISTINCT gloss COLLATE "C" FROM glosses
+                     WHERE sense_id = s.id AND gloss IS NOT NULL ORDER BY 1) as glosses
+        FROM senses s
+        ORDER BY s.entry_id, s.sense_order
+    """,
+    'conjugations': """
+        SELECT entry_id, conjugation_type, form, kanji, kana FROM conjugations
+        ORDER BY entry_id, conjugation_type, form
+    """,
+    'examples': """
+        SELECT entry_id, japanese, english FROM examples ORDER BY entry_id, id
+    """,
+}
+
+class _EntryRows:
+    """Rows of one export query, handed out entry by entry in entry id order."""
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._groups = groupby(rows, key=itemgetter(0))
+        self._next = next(self._groups, None)
+
+    def take(self, entry_id: str) -> List[tuple]:
+        """Rows of this entry (without the id column), or [] if it has none."""
+        if self._next is None or self._next[0] != entry_id:
+            return []
+        rows = [row[1:] for row in self._next[1]]
+        self._next = next(self._groups, None)
+        return rows
+
+def export_snapshot(conn, path: str, itersize: int = 50000) -> int:
+    """Write every dictionary entry to a snapshot file and return the entry count.
+
+    The entries and each of the EXPORT_QUERIES are read through their own
+    server-side cursor, all ordered by entry id, and merged one entry at a
+    time, so only the writer's packed tables are held in memory.
+    """
+    def stream(name: str, query: str):
+        with conn.cursor(name=f'snapshot_{name}') as cur:
+            cur.itersize = itersize
+            cur.execute(query)
+            yield from cur
+
+    children = {key: _EntryRows(stream(key, query)) for key, query in EXPORT_QUERIES.items()}
+    writer = SnapshotWriter()
+    count = 0
+    for entry_id, is_common in stream('entries', "SELECT id, is_common FROM entries ORDER BY id"):
+        writer.add_entry({
+            'id': entry_id,
+            'is_common': is_common,
+            'writing_forms': [{'text': text, 'type': form_type, 'is_common': form_common}
+                              for text, form_type, form_common in children['forms'].take(entry_id)],
+            'senses': [{'id': sense_id, 'sense_order': sense_order,
+                        'pos': list(pos), 'fields': list(fields), 'glosses': list(glosses)}
+                       for sense_id, sense_order, pos, fields, glosses in children['senses'].take(entry_id)],
+            'conjugations': [{'conjugation_type': conj_type, 'form': form, 'kanji': kanji, 'kana': kana}
+                             for conj_type, form, kanji, kana in children['conjugations'].take(entry_id)],
+            'examples': [{'japanese': japanese, 'english': english}
+                         for japanese, english in children['examples'].take(entry_id)]
+        })
+        count += 1
+    writer.write(path)
+    return count
+
+def main():
+    from db_pool import db_params_from_env, get_pool
+
+    parser = argparse.ArgumentParser(description="Export the dictionary to a memory-mapped snapshot")
+    parser.add_argument('path', nargs='?', default='dictionary.snapshot', help="Output file")
+    args = parser.parse_args()
+
+    with get_pool(db_params_from_env()).connection() as conn:
+        count = export_snapshot(conn, args.path)
+    print(f"Wrote {count} entries to {args.path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import hashlib
+import json
+from typing import Any, Dict, List
+
+ENTRY_FINGERPRINTS_DDL = """
+    CREATE TABLE IF NOT EXISTS entry_fingerprints (
+        entry_id TEXT PRIMARY KEY,
+        fingerprint TEXT NOT NULL,
+        updated_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+"""
+
+def entry_fingerprint(entry: Dict[str, Any]) -> str:
+    """SHA-1 of the entry's normalized JSON (sorted keys, no whitespace)."""
+    normalized = json.dumps(entry, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+def reset_fingerprints(cur) -> None:
+    """Create entry_fingerprints if needed and empty it before a full load.
+
+    Bulk loads COPY fingerprints alongside the entries, so stale rows
+    left after the dictionary tables were emptied would collide.
+    """
+    cur.execute(ENTRY_FINGERPRINTS_DDL)
+    cur.execute("TRUNCATE entry_fingerprints")
+
+def load_fingerprints(cur) -> Dict[str, str]:
+    cur.execute(ENTRY_FINGERPRINTS_DDL)
+    cur.execute("SELECT entry_id, fingerprint FROM entry_fingerprints")
+    return dict(cur.fetchall())
+
+def delete_entry_rows(cur, entry_ids: List[str]) -> None:
+    """Delete the rows an import writes for these entries, keeping the entries rows.
+
+    frequency_data, jlpt_levels and kanji_difficulty are keyed by entry
+    and not derived from the entry JSON, so they are kept for changed
+    entries.
+    """
+    for table in ('glosses', 'sense_pos', 'sense_fields'):
+        cur.execute(f"""
+            DELETE FROM {table}
+            WHERE sense_id IN (SELECT id FROM senses WHERE entry_id = ANY(%s))
+        """, (entry_ids,))
+    cur.execute("DELETE FROM senses WHERE entry_id = ANY(%s)", (entry_ids,))
+    for table in ('writing_forms', 'examples', 'conjugations'):
+        cur.execute(f"DELETE FROM {table} WHERE entry_id = ANY(%s)", (entry_ids,))
+    cur.execute("DELETE FROM word_relationships WHERE entry_id = ANY(%s)", (entry_ids,))
+
+def delete_entries(cur, entry_ids: List[str]) -> None:
+    """Remove entries that no longer exist upstream, with everything referring to them."""
+    delete_entry_rows(cur, entry_ids)
+    cur.execute("DELETE FROM word_relationships WHERE related_id = ANY(%s)", (entry_ids,))
+    for table in ('frequency_data', 'jlpt_levels', 'kanji_difficulty', 'quiz_verbs', 'entry_fingerprints'):
+        cur.execute(f"DELETE FROM {table} WHERE entry_id = ANY(%s)", (entry_ids,))
+    cur.execute("DELETE FROM entries WHERE id = ANY(%s)", (entry_ids,))
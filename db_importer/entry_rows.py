@@ -0,0 +1,49 @@
+from itertools import repeat
+from japanese_conjugator import iter_entry_forms
+from typing import Dict, List, Any, Tuple
+
+def entry_is_common(entry: Dict[str, Any]) -> bool:
+    """Check if any kanji or kana forms are marked as common."""
+    kanji_common = any(k.get('common', False) for k in entry.get('kanji', []))
+    kana_common = any(k.get('common', False) for k in entry.get('kana', []))
+    return kanji_common or kana_common
+
+def writing_form_rows(entry: Dict[str, Any]) -> List[Tuple]:
+    """Build (entry_id, form_text, form_type, is_common) rows for an entry."""
+    entry_id = entry['id']
+    writing_forms = []
+    for kanji in entry.get('kanji', []):
+        writing_forms.append((
+            entry_id,
+            kanji['text'],
+            'kanji',
+            kanji.get('common', False)
+        ))
+    for kana in entry.get('kana', []):
+        writing_forms.append((
+            entry_id,
+            kana['text'],
+            'kana',
+            kana.get('common', False)
+        ))
+    return writing_forms
+
+def example_rows(entry_id: str, sense: Dict[str, Any]) -> List[Tuple]:
+    """Build (entry_id, japanese, english) rows for the examples of a sense."""
+    examples = []
+    for example in sense.get('examples', []):
+        for sentence in example.get('sentences', []):
+            if sentence.get('land') == 'jpn':
+                japanese = sentence['text']
+            elif sentence.get('land') == 'eng':
+                english = sentence['text']
+                examples.append((entry_id, japanese, english))
+    return examples
+
+def conjugation_rows(entry: Dict[str, Any]) -> List[Tuple]:
+    """Build (entry_id, conjugation_type, form, kanji, kana) rows for an entry."""
+    entry_id = entry['id']
+    conjugation_values = []
+    for _, _, conj_type, forms, kanji, kana in iter_entry_forms(entry):
+        conjugation_values.extend(zip(repeat(entry_id), repeat(conj_type), forms, kanji, kana))
+    return conjugation_values
@@ -0,0 +1,111 @@
+import sys
+from typing import Dict, List, Iterable, Mapping, Tuple
+
+# Bump when the way counts are credited to entries changes, so stored sources get re-matched
+MATCHER_VERSION = 2
+
+def matcher_key(include_conjugations: bool = False) -> str:
+    """Identify how a source was matched, for comparing with what frequency_sources recorded."""
+    return f"v{MATCHER_VERSION}:{'conjugations' if include_conjugations else 'forms'}"
+
+class FormIndex:
+    """Map every surface form of a word (writing forms, optionally conjugations) to its entries.
+
+    A corpus is matched in one pass over its words: each word is a single
+    hash probe. Each distinct form counts once per entry, so an entry whose
+    kana reading equals its present-tense conjugation is not credited
+    twice. A form shared by several entries (homographs such as かえる)
+    has its count split evenly between them, since the corpus can't tell
+    which entry was meant.
+    """
+
+    def __init__(self):
+        self._index: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._index
+
+    def add(self, text: str, entry_id: str) -> None:
+        """Record that `text` is a form of the entry."""
+        if not text:
+            return
+        entry_id = sys.intern(entry_id)
+        entries = self._index.get(text)
+        if entries is None:
+            self._index[text] = [entry_id]
+        elif entry_id not in entries:
+            entries.append(entry_id)
+
+    def add_rows(self, rows: Iterable[Tuple[str, str]]) -> None:
+        """Record (entry_id, form_text) rows."""
+        for entry_id, text in rows:
+            self.add(text, entry_id)
+
+    def lookup(self, text: str) -> List[str]:
+        """Return the ids of the entries that have this form."""
+        return self._index.get(text, [])
+
+    def aggregate(self, frequency_data: Mapping[str, int]) -> Dict[str, float]:
+        """Sum corpus counts over all forms of each entry, splitting shared forms."""
+        totals: Dict[str, float] = {}
+        for word, count in frequency_data.items():
+            entries = self._index.get(word, ())
+            for entry_id in entries:
+                totals[entry_id] = totals.get(entry_id, 0) + count / len(entries)
+        return totals
+
+    @classmethod
+    def from_database(cls, conn, include_conjugations: bool = False,
+                      itersize: int = 50000) -> 'FormIndex':
+        """Build the index from writing_forms (and conjugations) using a server-side cursor."""
+        index = cls()
+        with conn.cursor(name='form_index') as cur:
+            cur.itersize = itersize
+            cur.execute(dictionary_forms_sql(include_conjugations))
+            index.add_rows(cur)
+        return index
+
+def dictionary_forms_sql(include_conjugations: bool = False) -> str:
+    """SELECT of distinct (entry_id, form_text) pairs over all forms of every entry."""
+    if not include_conjugations:
+        return "SELECT DISTINCT entry_id, form_text FROM writing_forms"
+    # UNION removes forms shared between writing forms and conjugations
+    return """
+        SELECT entry_id, form_text FROM writing_forms
+        UNION
+        SELECT entry_id, kanji FROM conjugations WHERE kanji <> ''
+        UNION
+        SELECT entry_id, kana FROM conjugations WHERE kana <> ''
+    """
+
+def matched_frequencies_sql(include_conjugations: bool = False) -> str:
+    """CTEs ending in `matched(entry_id, frequency)`, summing staged counts over all forms of each entry.
+
+    Like FormIndex.aggregate, a word matching several entries has its
+    count split evenly between them. Expects a frequency_staging(line_no, word, frequency) table; later
+    lines win for repeated words.
+    """
+    return f"""
+        word_forms AS (
+            {dictionary_forms_sql(include_conjugations)}
+        ),
+        staged AS (
+            SELECT DISTINCT ON (word) word, frequency
+            FROM frequency_staging
+            ORDER BY word, line_no DESC
+        ),
+        shared AS (
+            SELECT w.entry_id, s.frequency,
+                   COUNT(*) OVER (PARTITION BY w.form_text) as sharers
+            FROM word_forms w
+            JOIN staged s ON s.word = w.form_text
+        ),
+        matched AS (
+            SELECT entry_id, SUM(frequency::numeric / sharers) as frequency
+            FROM shared
+            GROUP BY entry_id
+        )
+    """
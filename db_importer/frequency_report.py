@@ -0,0 +1,95 @@
+import logging
+import mmap
+from typing import Iterator, NamedTuple, Optional
+
+class FrequencyRecord(NamedTuple):
+    """One line of a frequency report.
+
+    Word reports only have count and token; kanji reports add the dense
+    rank, rank, percent of the corpus and cumulative percent.
+    """
+    count: int
+    token: str
+    dense_rank: Optional[int] = None
+    rank: Optional[int] = None
+    percent: Optional[float] = None
+    cumulative_percent: Optional[float] = None
+
+def parse_record(line: bytes) -> Optional[FrequencyRecord]:
+    """Parse a tab-separated report line, returning None for blank or malformed lines."""
+    parts = line.rstrip(b'\r\n').decode('utf-8').strip().split('\t')
+    if len(parts) < 2:
+        return None
+    try:
+        count = int(parts[0])
+    except ValueError:
+        logging.warning(f"Skipping line due to invalid frequency value: {parts[0]}")
+        return None
+    extra = parts[2:6]
+    try:
+        ranks = [int(value) for value in extra[:2]]
+        percents = [float(value) for value in extra[2:]]
+    except ValueError:
+        logging.warning(f"Ignoring malformed rank/percent columns for {parts[1]}")
+        ranks, percents = [], []
+    return FrequencyRecord(count, parts[1], *ranks, *percents)
+
+class FrequencyReport:
+    """Stream records from a frequency report through a memory-mapped file.
+
+    Only the current line is decoded, so memory use does not grow with
+    the report size. Records are expected in descending count order,
+    which is what the top_n and coverage cutoffs rely on.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+
+    def _iter_lines(self) -> Iterator[bytes]:
+        with open(self.filename, 'rb') as f:
+            # mmap refuses empty files
+            if f.seek(0, 2) == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = 3 if mm[:3] == b'\xef\xbb\xbf' else 0
+                size = len(mm)
+                while pos < size:
+                    end = mm.find(b'\n', pos)
+                    if end == -1:
+                        end = size
+                    yield mm[pos:end]
+                    pos = end + 1
+
+    def __iter__(self) -> Iterator[FrequencyRecord]:
+        for line in self._iter_lines():
+            record = parse_record(line)
+            if record is not None:
+                yield record
+
+    def total_count(self) -> int:
+        """Sum of all counts in the report (one streaming pass)."""
+        return sum(record.count for record in self)
+
+    def records(self, top_n: Optional[int] = None,
+                coverage: Optional[float] = None) -> Iterator[FrequencyRecord]:
+        """Yield records, stopping after top_n records or once coverage percent of the corpus is reached.
+
+        The record that crosses the coverage threshold is included. Reports
+        without a cumulative percent column get it computed from the counts,
+        which costs one extra pass over the file.
+        """
+        total = None
+        running = 0
+        for i, record in enumerate(self):
+            if top_n is not None and i >= top_n:
+                return
+            yield record
+            if coverage is not None:
+                cumulative = record.cumulative_percent
+                if cumulative is None:
+                    if total is None:
+                        total = self.total_count() or 1
+                    running += record.count
+                    cumulative = running * 100.0 / total
+                if cumulative >= coverage:
+                    return
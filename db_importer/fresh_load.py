@@ -0,0 +1,133 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from db_pool import get_pool
+from bulk_loader import bulk_import
+from parallel_import import parallel_import
+from schema import EXTENSIONS, INDEX_DEFINITIONS, DICTIONARY_TABLES
+
+class PhaseTimer:
+    """Record how long each named phase of an import takes."""
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        print(f"{name}...")
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = time.perf_counter() - start
+
+    def report(self) -> None:
+        print("Phase timings:")
+        for name, seconds in self.durations.items():
+            print(f"  {name}: {seconds:.1f}s")
+        print(f"  total: {sum(self.durations.values()):.1f}s")
+
+def drop_secondary_indexes(conn) -> None:
+    """Drop the secondary indexes so the load doesn't maintain them row by row."""
+    with conn.cursor() as cur:
+        for name in INDEX_DEFINITIONS:
+            cur.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
+
+def drop_foreign_keys(conn) -> List[Tuple[str, str, str]]:
+    """Drop foreign keys on the dictionary tables and return (table, name, definition)."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT c.conrelid::regclass::text, c.conname, pg_get_constraintdef(c.oid)
+            FROM pg_constraint c
+            WHERE c.contype = 'f'
+            AND c.conrelid::regclass::text = ANY(%s)
+            ORDER BY c.conrelid::regclass::text, c.conname
+        """, (list(DICTIONARY_TABLES),))
+        foreign_keys = cur.fetchall()
+        for table, name, _ in foreign_keys:
+            cur.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+    conn.commit()
+    return foreign_keys
+
+def _build_index(db_params: dict, statement: str) -> None:
+    with get_pool(db_params).connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(statement)
+
+def default_index_workers(db_params: dict) -> int:
+    """One builder per index, leaving two pool connections for the importer itself."""
+    return max(1, min(len(INDEX_DEFINITIONS), get_pool(db_params).maxconn - 2))
+
+def rebuild_indexes(db_params: dict, workers: Optional[int] = None) -> None:
+    """Build all secondary indexes concurrently, one connection per index."""
+    workers = workers or default_index_workers(db_params)
+    with get_pool(db_params).connection() as conn:
+        with conn.cursor() as cur:
+            for statement in EXTENSIONS:
+                cur.execute(statement)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_build_index, db_params, statement)
+                   for statement in INDEX_DEFINITIONS.values()]
+        for future in futures:
+            future.result()
+
+def restore_foreign_keys(conn, foreign_keys: List[Tuple[str, str, str]]) -> None:
+    """Re-add foreign keys without checking existing rows."""
+    with conn.cursor() as cur:
+        for table, name, definition in foreign_keys:
+            cur.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition} NOT VALID")
+    conn.commit()
+
+def validate_foreign_keys(conn, foreign_keys: List[Tuple[str, str, str]]) -> None:
+    """Check each restored foreign key against the loaded rows in a single pass."""
+    with conn.cursor() as cur:
+        for table, name, _ in foreign_keys:
+            cur.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+    conn.commit()
+
+def fresh_import(db_params: dict, filename: str, workers: Optional[int] = None,
+                 restart: bool = False, index_workers: Optional[int] = None) -> Dict[str, int]:
+    """Load a JMdict file into empty tables with index and FK upkeep deferred.
+
+    `workers` is the number of load processes; `index_workers` (default
+    from default_index_workers) is how many indexes are built at once.
+    """
+    timer = PhaseTimer()
+    pool = get_pool(db_params)
+    conn = pool.getconn()
+    foreign_keys = []
+    restored = False
+    try:
+        with timer.phase("Dropping indexes and foreign keys"):
+            drop_secondary_indexes(conn)
+            foreign_keys = drop_foreign_keys(conn)
+
+        with timer.phase("Loading entries"):
+            if workers and workers > 1:
+                row_counts = parallel_import(db_params, filename, workers, restart=restart)
+            else:
+                row_counts = bulk_import(conn, filename)
+
+        with timer.phase("Rebuilding indexes"):
+            rebuild_indexes(db_params, index_workers)
+
+        with timer.phase("Validating foreign keys"):
+            restore_foreign_keys(conn, foreign_keys)
+            restored = True
+            validate_foreign_keys(conn, foreign_keys)
+
+        with timer.phase("Analyzing tables"):
+            with conn.cursor() as cur:
+                cur.execute(f"ANALYZE {', '.join(DICTIONARY_TABLES)}")
+            conn.commit()
+    finally:
+        if foreign_keys and not restored:
+            # Put the schema back (FKs unvalidated) so a failed load doesn't lose it
+            conn.rollback()
+            restore_foreign_keys(conn, foreign_keys)
+            rebuild_indexes(db_params, index_workers)
+        pool.putconn(conn)
+        timer.report()
+    return row_counts
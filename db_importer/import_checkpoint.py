@@ -0,0 +1,172 @@
+import os
+import time
+from typing import Dict, Optional, Set, Tuple
+
+IMPORT_CHECKPOINTS_DDL = """
+    CREATE TABLE IF NOT EXISTS import_checkpoints (
+        filename TEXT PRIMARY KEY,
+        file_size BIGINT NOT NULL,
+        entries_done INTEGER NOT NULL,
+        last_entry_id TEXT,
+        completed BOOLEAN NOT NULL DEFAULT FALSE,
+        started_at TIMESTAMP NOT NULL DEFAULT now(),
+        updated_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+"""
+
+IMPORT_BATCHES_DDL = """
+    CREATE TABLE IF NOT EXISTS import_batches (
+        filename TEXT NOT NULL,
+        batch_no INTEGER NOT NULL,
+        batch_size INTEGER NOT NULL,
+        base_sense_id INTEGER NOT NULL,
+        committed_at TIMESTAMP NOT NULL DEFAULT now(),
+        PRIMARY KEY (filename, batch_no)
+    )
+"""
+
+def checkpoint_key(filename: str) -> Tuple[str, str]:
+    """(key, path prefix) identifying this exact version of a file.
+
+    The key is the absolute path plus size and modification time, so
+    files with the same name in different directories, or a file replaced
+    in place, never share a checkpoint. Keys of other versions of the same
+    path start with the prefix.
+    """
+    path = os.path.abspath(filename)
+    stat = os.stat(path)
+    return f"{path}:{stat.st_size}:{stat.st_mtime_ns}", f"{path}:"
+
+def _check_other_versions(cur, table: str, key: str, prefix: str) -> None:
+    """Refuse to resume when progress was recorded for a different version of the file."""
+    cur.execute(f"""
+        SELECT 1 FROM {table}
+        WHERE starts_with(filename, %s) AND filename <> %s
+        LIMIT 1
+    """, (prefix, key))
+    if cur.fetchone():
+        raise ValueError(f"{prefix[:-1]} changed since the checkpointed import; rerun with --restart")
+
+class ImportCheckpoint:
+    """Record how many entries of a file have been committed.
+
+    save() must run in the same transaction as the batch it covers, so
+    the checkpoint and the imported rows are committed (or rolled back)
+    together and a resumed import never inserts an entry twice.
+    """
+
+    def __init__(self, conn, filename: str):
+        self.conn = conn
+        self.key, self.prefix = checkpoint_key(filename)
+        self.file_size = os.path.getsize(filename)
+
+    def load(self) -> Tuple[int, Optional[str], bool]:
+        """Return (entries_done, last_entry_id, completed) for this file, or (0, None, False)."""
+        with self.conn.cursor() as cur:
+            cur.execute(IMPORT_CHECKPOINTS_DDL)
+            cur.execute("""
+                SELECT entries_done, last_entry_id, completed
+                FROM import_checkpoints
+                WHERE filename = %s
+            """, (self.key,))
+            row = cur.fetchone()
+            if row is None:
+                _check_other_versions(cur, 'import_checkpoints', self.key, self.prefix)
+        self.conn.commit()
+        if row is None:
+            return 0, None, False
+        return tuple(row)
+
+    def save(self, cur, entries_done: int, last_entry_id: Optional[str], completed: bool = False) -> None:
+        cur.execute("""
+            INSERT INTO import_checkpoints (filename, file_size, entries_done, last_entry_id, completed)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (filename) DO UPDATE
+            SET file_size = EXCLUDED.file_size,
+                entries_done = EXCLUDED.entries_done,
+                last_entry_id = EXCLUDED.last_entry_id,
+                completed = EXCLUDED.completed,
+                updated_at = now()
+        """, (self.key, self.file_size, entries_done, last_entry_id, completed))
+
+    def clear(self) -> None:
+        """Forget the checkpoints of every version of the file, so the next import starts from the beginning."""
+        with self.conn.cursor() as cur:
+            cur.execute(IMPORT_CHECKPOINTS_DDL)
+            cur.execute("DELETE FROM import_checkpoints WHERE starts_with(filename, %s)", (self.prefix,))
+        self.conn.commit()
+
+class ImportBatchLog:
+    """Record which batches of a parallel import have been committed.
+
+    Parallel workers commit their batches independently, so an
+    interrupted load leaves some batches in the tables and not others.
+    Each worker saves its batch number in the same transaction as the
+    batch's rows; a rerun reuses the original sense-ID base, so batch
+    numbers and sense IDs line up again, and loads only the missing batches.
+    """
+
+    def __init__(self, filename: str, batch_size: int):
+        self.key, self.prefix = checkpoint_key(filename)
+        self.batch_size = batch_size
+
+    def load(self, conn) -> Tuple[Optional[int], Set[int]]:
+        """Return (base_sense_id, committed batch numbers), or (None, empty set) for a new import."""
+        with conn.cursor() as cur:
+            cur.execute(IMPORT_BATCHES_DDL)
+            cur.execute("""
+                SELECT batch_no, batch_size, base_sense_id
+                FROM import_batches
+                WHERE filename = %s
+            """, (self.key,))
+            rows = cur.fetchall()
+            if not rows:
+                _check_other_versions(cur, 'import_batches', self.key, self.prefix)
+        conn.commit()
+        if not rows:
+            return None, set()
+        if any(batch_size != self.batch_size for _, batch_size, _ in rows):
+            raise ValueError(f"{self.key} was partly imported with a different batch size; rerun with --restart")
+        return rows[0][2], {batch_no for batch_no, _, _ in rows}
+
+    def save(self, cur, batch_no: int, base_sense_id: int) -> None:
+        cur.execute("""
+            INSERT INTO import_batches (filename, batch_no, batch_size, base_sense_id)
+            VALUES (%s, %s, %s, %s)
+        """, (self.key, batch_no, self.batch_size, base_sense_id))
+
+    def clear(self, conn) -> None:
+        """Forget the committed batches of every version of the file, so the next import starts over."""
+        with conn.cursor() as cur:
+            cur.execute(IMPORT_BATCHES_DDL)
+            cur.execute("DELETE FROM import_batches WHERE starts_with(filename, %s)", (self.prefix,))
+        conn.commit()
+
+class ImportProgress:
+    """Track entries/sec, rows/sec per table and an ETA from the share of the file read.
+
+    `start_bytes` is where this run started reading (non-zero when
+    resuming), so the ETA only extrapolates from work done in this run.
+    """
+
+    def __init__(self, total_bytes: int, start_bytes: int = 0):
+        self.total_bytes = total_bytes
+        self.start_bytes = start_bytes
+        self.start = time.monotonic()
+        self.entries = 0
+        self.row_counts: Dict[str, int] = {}
+
+    def add(self, counts: Dict[str, int]) -> None:
+        self.entries += 1
+        for table, count in counts.items():
+            self.row_counts[table] = self.row_counts.get(table, 0) + count
+
+    def report(self, bytes_read: int, done_before: int = 0) -> str:
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        line = f"Entry {done_before + self.entries}: {self.entries / elapsed:.0f} entries/s"
+        if bytes_read > self.start_bytes and self.total_bytes > self.start_bytes:
+            rate = (bytes_read - self.start_bytes) / elapsed
+            eta = max(self.total_bytes - bytes_read, 0) / rate
+            line += f", {min(bytes_read / self.total_bytes, 1.0):.0%} of file, ETA {eta:.0f}s"
+        rates = ', '.join(f"{table} {count / elapsed:.0f}/s" for table, count in self.row_counts.items())
+        return f"{line}\n  rows: {rates}" if rates else line
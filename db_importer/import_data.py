@@ -1,21 +1,34 @@
-import json
-import psycopg2
+import argparse
+import os
+from itertools import islice
 from psycopg2.extras import execute_values
-from japanese_conjugator import process_dictionary_entry
+from entry_rows import entry_is_common, writing_form_rows, example_rows, conjugation_rows
+from jmdict_reader import JMdictReader, iter_entries
+from entry_fingerprints import (ENTRY_FINGERPRINTS_DDL, entry_fingerprint, load_fingerprints,
+                                delete_entry_rows, delete_entries)
+from import_checkpoint import ImportCheckpoint, ImportProgress
+from bulk_loader import bulk_import
+from parallel_import import parallel_import
+from fresh_load import fresh_import
+from schema import EXTENSIONS, INDEX_DEFINITIONS
+from lookup_cache import invalidate_all
+from import_frequency import forget_frequency_sources
+from quiz_pool import refresh_quiz_pool
+from dictionary_snapshot import export_snapshot
+from kanji_frequency import KanjiIndex, load_kanji_frequency, refresh_kanji_difficulty
 from typing import Dict, List, Any
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from db_pool import db_params_from_env, get_pool
 
-def process_entry(entry: Dict[str, Any], cur) -> None:
-    """Process a single dictionary entry and insert it into the database."""
+def process_entry(entry: Dict[str, Any], cur) -> Dict[str, int]:
+    """Process a single dictionary entry and insert it into the database.
+    
+    Returns the number of rows written per table (attempted rows, for
+    tables where conflicting rows are skipped).
+    """
     entry_id = entry['id']
+    counts = {'entries': 1}
     
-    # Check if any kanji or kana forms are marked as common
-    kanji_common = any(k.get('common', False) for k in entry.get('kanji', []))
-    kana_common = any(k.get('common', False) for k in entry.get('kana', []))
-    is_common = kanji_common or kana_common
+    is_common = entry_is_common(entry)
     
     # Insert entry
     cur.execute(
@@ -24,21 +37,8 @@ def process_entry(entry: Dict[str, Any], cur) -> None:
     )
     
     # Insert writing forms
-    writing_forms = []
-    for kanji in entry.get('kanji', []):
-        writing_forms.append((
-            entry_id,
-            kanji['text'],
-            'kanji',
-            kanji.get('common', False)
-        ))
-    for kana in entry.get('kana', []):
-        writing_forms.append((
-            entry_id,
-            kana['text'],
-            'kana',
-            kana.get('common', False)
-        ))
+    writing_forms = writing_form_rows(entry)
+    counts['writing_forms'] = len(writing_forms)
     
     if writing_forms:
         execute_values(cur,
@@ -54,9 +54,11 @@ def process_entry(entry: Dict[str, Any], cur) -> None:
             (entry_id, sense_idx)
         )
         sense_id = cur.fetchone()[0]
+        counts['senses'] = counts.get('senses', 0) + 1
         
         # Insert parts of speech
         pos_values = [(sense_id, pos) for pos in sense.get('partOfSpeech', [])]
+        counts['sense_pos'] = counts.get('sense_pos', 0) + len(pos_values)
         if pos_values:
             execute_values(cur,
                 "INSERT INTO sense_pos (sense_id, pos) VALUES %s ON CONFLICT DO NOTHING",
@@ -65,6 +67,7 @@ def process_entry(entry: Dict[str, Any], cur) -> None:
         
         # Insert fields (categories)
         field_values = [(sense_id, field) for field in sense.get('field', [])]
+        counts['sense_fields'] = counts.get('sense_fields', 0) + len(field_values)
         if field_values:
             execute_values(cur,
                 "INSERT INTO sense_fields (sense_id, field) VALUES %s ON CONFLICT DO NOTHING",
@@ -74,6 +77,7 @@ def process_entry(entry: Dict[str, Any], cur) -> None:
         # Insert glosses
         gloss_values = [(sense_id, gloss['text'], gloss.get('lang', 'eng')) 
                        for gloss in sense.get('gloss', [])]
+        counts['glosses'] = counts.get('glosses', 0) + len(gloss_values)
         if gloss_values:
             execute_values(cur,
                 "INSERT INTO glosses (sense_id, gloss, lang) VALUES %s",
@@ -81,14 +85,8 @@ def process_entry(entry: Dict[str, Any], cur) -> None:
             )
         
         # Insert examples
-        examples = []
-        for example in sense.get('examples', []):
-            for sentence in example.get('sentences', []):
-                if sentence.get('land') == 'jpn':
-                    japanese = sentence['text']
-                elif sentence.get('land') == 'eng':
-                    english = sentence['text']
-                    examples.append((entry_id, japanese, english))
+        examples = example_rows(entry_id, sense)
+        counts['examples'] = counts.get('examples', 0) + len(examples)
         
         if examples:
             execute_values(cur,
@@ -97,18 +95,8 @@ def process_entry(entry: Dict[str, Any], cur) -> None:
             )
     
     # Process conjugations
-    conjugation_results = process_dictionary_entry(entry)
-    conjugation_values = []
-    for result in conjugation_results:
-        conj_type = result['type']
-        for form, conj in result['conjugations'].items():
-            conjugation_values.append((
-                entry_id,
-                conj_type,
-                form,
-                conj['kanji'],
-                conj['kana']
-            ))
+    conjugation_values = conjugation_rows(entry)
+    counts['conjugations'] = len(conjugation_values)
     
     if conjugation_values:
         execute_values(cur,
@@ -124,66 +112,230 @@ def process_entry(entry: Dict[str, Any], cur) -> None:
             if isinstance(related, list) and len(related) >= 1:
                 # Store for second pass - we need all entries to be inserted first
                 pass
+    
+    return counts
 
 def create_indices(conn) -> None:
     """Create indices for better query performance."""
     with conn.cursor() as cur:
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_writing_forms_text ON writing_forms(form_text);
-            CREATE INDEX IF NOT EXISTS idx_senses_entry_id ON senses(entry_id);
-            CREATE INDEX IF NOT EXISTS idx_glosses_sense_id ON glosses(sense_id);
-            CREATE INDEX IF NOT EXISTS idx_examples_entry_id ON examples(entry_id);
-            CREATE INDEX IF NOT EXISTS idx_conjugations_entry_id ON conjugations(entry_id);
-            CREATE INDEX IF NOT EXISTS idx_word_relationships_entry_id ON word_relationships(entry_id);
-        """)
+        for statement in EXTENSIONS + tuple(INDEX_DEFINITIONS.values()):
+            cur.execute(statement)
     conn.commit()
 
+def save_fingerprints(cur, rows: List[tuple]) -> None:
+    """Upsert (entry_id, fingerprint) rows, so --diff imports can skip unchanged entries."""
+    execute_values(cur, """
+        INSERT INTO entry_fingerprints (entry_id, fingerprint) VALUES %s
+        ON CONFLICT (entry_id) DO UPDATE
+        SET fingerprint = EXCLUDED.fingerprint, updated_at = now()
+    """, rows)
+
+def import_entries(conn, filename: str, batch_size: int = 1000,
+                   restart: bool = False) -> Dict[str, int]:
+    """Import a JMdict file entry by entry, committing every batch_size entries.
+    
+    Each commit also records how many entries are done, so after a crash
+    the next run skips the committed entries and carries on from there.
+    Pass restart=True to ignore the checkpoint and start over; rows an
+    earlier run already committed are then deleted and rewritten batch by
+    batch (as diff_import_entries does), so senses and glosses are not
+    duplicated.
+    """
+    checkpoint = ImportCheckpoint(conn, filename)
+    if restart:
+        checkpoint.clear()
+    done, last_entry_id, completed = checkpoint.load()
+    if completed:
+        print(f"{filename} was already imported; use --restart to import it again")
+        return {}
+    
+    reader = JMdictReader(filename)
+    entries = iter(reader)
+    if done:
+        print(f"Resuming after entry {done} ({last_entry_id})")
+        # Parse (but don't insert) the committed entries, checking we land on the same one
+        entry = None
+        for entry in islice(entries, done):
+            pass
+        if entry is None or entry['id'] != last_entry_id:
+            raise ValueError(f"Checkpoint does not match {filename}; rerun with --restart")
+    
+    progress = ImportProgress(os.path.getsize(filename), reader.bytes_read)
+    with conn.cursor() as cur:
+        cur.execute(ENTRY_FINGERPRINTS_DDL)
+        
+        def write_batch(batch):
+            if restart:
+                # Senses and glosses have no conflict key; drop what an earlier run committed
+                delete_entry_rows(cur, [entry['id'] for entry in batch])
+            for entry in batch:
+                progress.add(process_entry(entry, cur))
+            save_fingerprints(cur, [(entry['id'], entry_fingerprint(entry)) for entry in batch])
+        
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            done += 1
+            last_entry_id = entry['id']
+            
+            # Commit the batch together with its fingerprints and checkpoint
+            if len(batch) >= batch_size:
+                write_batch(batch)
+                batch = []
+                checkpoint.save(cur, done, last_entry_id)
+                conn.commit()
+                print(progress.report(reader.bytes_read, done - progress.entries))
+        
+        if batch:
+            write_batch(batch)
+        checkpoint.save(cur, done, last_entry_id, completed=True)
+    
+    # Final commit for any remaining entries
+    conn.commit()
+    return progress.row_counts
+
+def diff_import_entries(conn, filename: str, batch_size: int = 1000) -> Dict[str, int]:
+    """Apply a new JMdict release by rewriting only the entries that changed.
+    
+    Every entry is fingerprinted (hash of its normalized JSON) and
+    compared with the fingerprint stored by the previous import (every
+    import path stores them). Added and
+    changed entries have their rows deleted and rewritten (regenerating
+    conjugations), and entries missing from the file are removed. Entries
+    imported before fingerprints existed count as changed on the first run.
+    """
+    counts = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+    with conn.cursor() as cur:
+        fingerprints = load_fingerprints(cur)
+        cur.execute("SELECT id FROM entries")
+        existing = {entry_id for (entry_id,) in cur.fetchall()}
+        conn.commit()
+        
+        def flush(batch):
+            entry_ids = [entry['id'] for entry, _ in batch]
+            delete_entry_rows(cur, entry_ids)
+            # is_common may have changed; process_entry leaves existing entries rows alone
+            execute_values(cur, """
+                UPDATE entries SET is_common = v.is_common
+                FROM (VALUES %s) AS v(id, is_common)
+                WHERE entries.id = v.id
+            """, [(entry['id'], entry_is_common(entry)) for entry, _ in batch])
+            for entry, _ in batch:
+                process_entry(entry, cur)
+            save_fingerprints(cur, [(entry['id'], fingerprint) for entry, fingerprint in batch])
+            conn.commit()
+        
+        seen = set()
+        batch = []
+        for entry in iter_entries(filename):
+            entry_id = entry['id']
+            seen.add(entry_id)
+            fingerprint = entry_fingerprint(entry)
+            if entry_id in existing and fingerprints.get(entry_id) == fingerprint:
+                counts['unchanged'] += 1
+                continue
+            counts['changed' if entry_id in existing else 'added'] += 1
+            batch.append((entry, fingerprint))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        
+        removed = sorted(existing - seen)
+        for i in range(0, len(removed), batch_size):
+            delete_entries(cur, removed[i:i + batch_size])
+        if removed or counts['added'] or counts['changed']:
+            # Frequency reports must be matched against the new writing forms
+            forget_frequency_sources(cur)
+        conn.commit()
+        counts['removed'] = len(removed)
+    return counts
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import a JMdict JSON file into the database.")
+    parser.add_argument('filename', nargs='?', default='jmdict-examples-eng-3.6.1.json',
+                        help="Path to the jmdict-simplified JSON file")
+    parser.add_argument('--bulk', action='store_true',
+                        help="Load through COPY in large batches (expects empty dictionary tables)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of worker processes for a parallel bulk load")
+    parser.add_argument('--fresh', action='store_true',
+                        help="Drop indexes and foreign keys during the load and rebuild them afterwards")
+    parser.add_argument('--index-workers', type=int,
+                        help="Indexes rebuilt concurrently after a --fresh load "
+                             "(default: one per index, capped by DB_POOL_MAX - 2)")
+    parser.add_argument('--diff', action='store_true',
+                        help="Only rewrite entries added, changed or removed since the last import")
+    parser.add_argument('--restart', action='store_true',
+                        help="Ignore the checkpoint (or committed parallel batches) of an interrupted import and start over")
+    parser.add_argument('--kanji-report', default='kanji_freq_report.txt',
+                        help="Kanji frequency report used to score entries by kanji difficulty")
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help="Also export a memory-mapped snapshot for DB-free lookups")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
     # Database connection parameters from environment variables
-    db_params = {
-        'dbname': os.getenv('DB_NAME'),
-        'user': os.getenv('DB_USER'),
-        'password': os.getenv('DB_PASSWORD'),
-        'host': os.getenv('DB_HOST'),
-        'port': os.getenv('DB_PORT', '5432')
-    }
-    
-    # Connect to database
-    conn = psycopg2.connect(**db_params)
-    
-    try:        
-        # Read and process the JSON file
-        with open('jmdict-examples-eng-3.6.1.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-            # First pass: Process all entries
-            total_entries = len(data['words'])
-            print(f"Processing {total_entries} entries...")
-            
+    db_params = db_params_from_env()
+    
+    # Check out a pooled connection
+    pool = get_pool(db_params)
+    conn = pool.getconn()
+    
+    try:
+        # Stream entries from the JSON file instead of loading it all at once
+        print("Processing entries...")
+        row_counts = {}
+        if args.diff:
+            row_counts = diff_import_entries(conn, args.filename)
+        elif args.fresh:
+            row_counts = fresh_import(db_params, args.filename, args.workers, restart=args.restart,
+                                      index_workers=args.index_workers)
+        elif args.workers > 1:
+            row_counts = parallel_import(db_params, args.filename, args.workers, restart=args.restart)
+        elif args.bulk:
+            row_counts = bulk_import(conn, args.filename)
+        else:
+            row_counts = import_entries(conn, args.filename, restart=args.restart)
+        if not args.diff:
+            # Frequency reports must be matched against the new writing forms
             with conn.cursor() as cur:
-                for i, entry in enumerate(data['words'], 1):
-                    if i % 1000 == 0:
-                        print(f"Processing entry {i}/{total_entries}")
-                    process_entry(entry, cur)
-                    
-                    # Commit every 1000 entries
-                    if i % 1000 == 0:
-                        conn.commit()
-            
-            # Final commit for any remaining entries
+                forget_frequency_sources(cur)
             conn.commit()
-            
-            # Create indices after all data is inserted
-            print("Creating indices...")
-            create_indices(conn)
-            
-            print("Database population completed successfully!")
+        for table, count in row_counts.items():
+            print(f"  {table}: {count} rows")
+        
+        # Create indices after all data is inserted
+        print("Creating indices...")
+        create_indices(conn)
+        
+        print("Refreshing quiz pool...")
+        quiz_verbs = refresh_quiz_pool(conn)
+        print(f"  quiz_verbs: {quiz_verbs} rows")
+        
+        if os.path.exists(args.kanji_report):
+            print("Scoring kanji difficulty...")
+            kanji_index = KanjiIndex.from_report(args.kanji_report)
+            load_kanji_frequency(conn, kanji_index)
+            scored = refresh_kanji_difficulty(conn, kanji_index)
+            print(f"  kanji_difficulty: {scored} rows")
+        
+        if args.snapshot:
+            print("Exporting snapshot...")
+            exported = export_snapshot(conn, args.snapshot)
+            print(f"  {args.snapshot}: {exported} entries")
+        
+        invalidate_all(conn)
+        print("Database population completed successfully!")
     
     except Exception as e:
         print(f"Error: {e}")
         conn.rollback()
     finally:
-        conn.close()
+        pool.putconn(conn)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
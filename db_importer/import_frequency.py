@@ -1,11 +1,16 @@
-import psycopg2
+import argparse
 import csv
+import hashlib
+import io
 import logging
-from typing import Dict, List, Tuple
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from bulk_loader import copy_line
+from db_pool import db_params_from_env, get_pool
+from frequency_matcher import FormIndex, dictionary_forms_sql, matched_frequencies_sql, matcher_key
+from frequency_report import FrequencyReport
+from lookup_cache import invalidate_all
+from quiz_pool import refresh_quiz_pool
 
 # Set up logging
 logging.basicConfig(
@@ -13,10 +18,41 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+FREQUENCY_SOURCES_DDL = """
+    CREATE TABLE IF NOT EXISTS frequency_sources (
+        source TEXT PRIMARY KEY,
+        filename TEXT,
+        checksum TEXT NOT NULL,
+        row_count INTEGER,
+        matcher TEXT,
+        updated_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+"""
+
+# Tables created before the matcher column existed; NULL never matches, so those sources are re-ingested
+FREQUENCY_SOURCES_MIGRATIONS = (
+    "ALTER TABLE frequency_sources ADD COLUMN IF NOT EXISTS matcher TEXT",
+)
+
+def ensure_frequency_sources(cur) -> None:
+    cur.execute(FREQUENCY_SOURCES_DDL)
+    for statement in FREQUENCY_SOURCES_MIGRATIONS:
+        cur.execute(statement)
+
+def forget_frequency_sources(cur) -> None:
+    """Drop the ingested checksums, so the next ingest of every source re-matches it.
+
+    Which entries a report's words match depends on the dictionary's
+    writing forms, so any import that changes entries must call this.
+    """
+    ensure_frequency_sources(cur)
+    cur.execute("DELETE FROM frequency_sources")
+
 class FrequencyUpdater:
-    def __init__(self, db_params: dict):
-        """Initialize database connection."""
-        self.conn = psycopg2.connect(**db_params)
+    def __init__(self, db_params: Optional[dict] = None):
+        """Check out a pooled database connection."""
+        self.pool = get_pool(db_params)
+        self.conn = self.pool.getconn()
         self.cursor = self.conn.cursor()
         
     def __enter__(self):
@@ -27,61 +63,37 @@ class FrequencyUpdater:
         if self.cursor:
             self.cursor.close()
         if self.conn:
-            self.conn.close()
+            self.pool.putconn(self.conn)
 
-    def read_frequency_data(self, filename: str) -> Dict[str, int]:
-        """Read frequency data from the file."""
-        frequency_data = {}
+    def read_frequency_data(self, filename: str, top_n: Optional[int] = None,
+                            coverage: Optional[float] = None) -> Dict[str, int]:
+        """Read frequency data from the file, optionally cut off at top_n words or coverage percent."""
         try:
-            with open(filename, 'r', encoding='utf-8-sig') as f:  # Changed to utf-8-sig to handle BOM
-                for line in f:
-                    parts = line.strip().split('\t')
-                    if len(parts) >= 2:
-                        try:
-                            freq = int(parts[0])
-                            word = parts[1]
-                            frequency_data[word] = freq
-                        except ValueError as e:
-                            logging.warning(f"Skipping line due to invalid frequency value: {parts[0]}")
-            
+            frequency_data = dict(iter_report_lines(filename, top_n, coverage))
             logging.info(f"Read {len(frequency_data)} words from frequency file")
             return frequency_data
         except Exception as e:
             logging.error(f"Error reading frequency file: {e}")
             raise
 
-    def get_dictionary_words(self) -> List[Tuple[str, str]]:
-        """Get all words from dictionary with their IDs, handling multiple writing forms."""
-        query = """
-        WITH word_forms AS (
-            SELECT e.id,
-                   wf.form_text,
-                   wf.form_type,
-                   ROW_NUMBER() OVER (PARTITION BY e.id ORDER BY wf.form_type) as rn
-            FROM entries e
-            JOIN writing_forms wf ON e.id = wf.entry_id
-        )
-        SELECT id, form_text
-        FROM word_forms
-        WHERE rn = 1
-        """
+    def get_dictionary_words(self, include_conjugations: bool = False) -> List[Tuple[str, str]]:
+        """Get (entry_id, form_text) for every writing form (and conjugated form) in the dictionary."""
         try:
-            self.cursor.execute(query)
+            self.cursor.execute(dictionary_forms_sql(include_conjugations))
             return self.cursor.fetchall()
         except Exception as e:
             logging.error(f"Error fetching dictionary words: {e}")
             raise
 
-    def update_frequencies(self, frequency_data: Dict[str, int]):
-        """Update frequency data in the database."""
-        # First, get all words from dictionary
-        dictionary_words = self.get_dictionary_words()
-        
+    def update_frequencies(self, frequency_data: Dict[str, int], include_conjugations: bool = False):
+        """Update frequency data in the database, summing counts over all forms of each entry."""
+        # First, index all forms of every dictionary word
+        index = FormIndex()
+        index.add_rows(self.get_dictionary_words(include_conjugations))
+
         # Prepare batch update
-        update_data = []
-        for entry_id, word in dictionary_words:
-            if word in frequency_data:
-                update_data.append((entry_id, 'web_corpus', frequency_data[word]))
+        update_data = [(entry_id, 'web_corpus', frequency)
+                       for entry_id, frequency in index.aggregate(frequency_data).items()]
 
         # Clear existing frequency data for this source
         try:
@@ -115,6 +127,10 @@ class FrequencyUpdater:
             """)
             
             self.conn.commit()
+            
+            # Quiz pool order depends on frequency ranks
+            refresh_quiz_pool(self.conn)
+            invalidate_all(self.conn)
             logging.info(f"Updated frequencies for {len(update_data)} words")
             
         except Exception as e:
@@ -122,23 +138,254 @@ class FrequencyUpdater:
             logging.error(f"Error updating frequencies: {e}")
             raise
 
+    def _stage_frequencies(self, rows: Iterable[Tuple[str, int]], chunk_lines: int = 50000) -> int:
+        """Stream (word, frequency) rows into a transaction-scoped temp table with COPY."""
+        self.cursor.execute("""
+            CREATE TEMP TABLE frequency_staging (
+                line_no INTEGER,
+                word TEXT,
+                frequency BIGINT
+            ) ON COMMIT DROP
+        """)
+
+        buffer = []
+        staged = 0
+        for line_no, (word, frequency) in enumerate(rows):
+            buffer.append(copy_line((line_no, word, frequency)))
+            if len(buffer) >= chunk_lines:
+                self.cursor.copy_expert("COPY frequency_staging FROM STDIN", io.StringIO(''.join(buffer)))
+                staged += len(buffer)
+                buffer = []
+        if buffer:
+            self.cursor.copy_expert("COPY frequency_staging FROM STDIN", io.StringIO(''.join(buffer)))
+            staged += len(buffer)
+        self.cursor.execute("ANALYZE frequency_staging")
+        return staged
+
+    def update_frequencies_from_file(self, filename: str, source: str = 'web_corpus',
+                                     chunk_lines: int = 50000, top_n: Optional[int] = None,
+                                     coverage: Optional[float] = None,
+                                     include_conjugations: bool = False):
+        """Update frequency data with set-based SQL instead of matching rows in Python.
+
+        The file is streamed into a temporary table with COPY, then matched
+        against all forms of each entry, inserted and ranked in one
+        statement, all in a single transaction.
+        """
+        try:
+            staged = self._stage_frequencies(iter_report_lines(filename, top_n, coverage), chunk_lines)
+            logging.info(f"Staged {staged} words from frequency file")
+
+            self.cursor.execute("""
+                DELETE FROM frequency_data
+                WHERE source = %s
+            """, (source,))
+
+            self.cursor.execute(f"""
+                WITH {matched_frequencies_sql(include_conjugations)}
+                INSERT INTO frequency_data (entry_id, source, frequency, rank)
+                SELECT entry_id, %s, frequency,
+                       RANK() OVER (ORDER BY frequency DESC)
+                FROM matched
+            """, (source,))
+            updated = self.cursor.rowcount
+
+            self.conn.commit()
+
+            # Quiz pool order depends on frequency ranks
+            refresh_quiz_pool(self.conn)
+            invalidate_all(self.conn)
+            logging.info(f"Updated frequencies for {updated} words")
+
+        except Exception as e:
+            self.conn.rollback()
+            logging.error(f"Error updating frequencies: {e}")
+            raise
+
+    def ingest_source(self, source: 'FrequencySource', force: bool = False,
+                      include_conjugations: bool = False) -> Optional[Dict[str, int]]:
+        """Apply one corpus as an upsert diff against its existing rows.
+
+        Returns None when the file checksum and matching mode match the
+        last ingested version (unless force is set; dictionary imports
+        clear the stored checksums, see forget_frequency_sources), otherwise the number of rows
+        inserted, updated and deleted. Ranks are recomputed only for this
+        source, and only rows whose rank actually moved are written.
+        Does not refresh the quiz pool; see ingest_sources.
+        """
+        checksum = file_checksum(source.filename)
+        matcher = matcher_key(include_conjugations)
+        try:
+            ensure_frequency_sources(self.cursor)
+            self.cursor.execute(
+                "SELECT checksum, matcher FROM frequency_sources WHERE source = %s", (source.name,))
+            row = self.cursor.fetchone()
+            if row and tuple(row) == (checksum, matcher) and not force:
+                self.conn.rollback()
+                logging.info(f"Source {source.name} unchanged, skipping")
+                return None
+
+            staged = self._stage_frequencies(source.reader(source.filename))
+            self.cursor.execute(f"""
+                CREATE TEMP TABLE frequency_incoming ON COMMIT DROP AS
+                WITH {matched_frequencies_sql(include_conjugations)}
+                SELECT entry_id, frequency FROM matched
+            """)
+
+            self.cursor.execute("""
+                DELETE FROM frequency_data fd
+                WHERE fd.source = %s
+                AND NOT EXISTS (
+                    SELECT 1 FROM frequency_incoming i WHERE i.entry_id = fd.entry_id
+                )
+            """, (source.name,))
+            deleted = self.cursor.rowcount
+
+            # xmax = 0 only for freshly inserted rows, which separates inserts from updates
+            self.cursor.execute("""
+                INSERT INTO frequency_data (entry_id, source, frequency)
+                SELECT entry_id, %s, frequency FROM frequency_incoming
+                ON CONFLICT (entry_id, source) DO UPDATE
+                SET frequency = EXCLUDED.frequency
+                WHERE frequency_data.frequency IS DISTINCT FROM EXCLUDED.frequency
+                RETURNING (xmax = 0) as inserted
+            """, (source.name,))
+            results = [inserted for (inserted,) in self.cursor.fetchall()]
+            inserted = sum(results)
+            updated = len(results) - inserted
+
+            if inserted or updated or deleted:
+                self.cursor.execute("""
+                    WITH ranked AS (
+                        SELECT entry_id,
+                               RANK() OVER (ORDER BY frequency DESC) as calculated_rank
+                        FROM frequency_data
+                        WHERE source = %s
+                    )
+                    UPDATE frequency_data fd
+                    SET rank = r.calculated_rank
+                    FROM ranked r
+                    WHERE fd.source = %s
+                    AND fd.entry_id = r.entry_id
+                    AND fd.rank IS DISTINCT FROM r.calculated_rank
+                """, (source.name, source.name))
+
+            self.cursor.execute("""
+                INSERT INTO frequency_sources (source, filename, checksum, row_count, matcher, updated_at)
+                VALUES (%s, %s, %s, %s, %s, now())
+                ON CONFLICT (source) DO UPDATE
+                SET filename = EXCLUDED.filename,
+                    checksum = EXCLUDED.checksum,
+                    row_count = EXCLUDED.row_count,
+                    matcher = EXCLUDED.matcher,
+                    updated_at = EXCLUDED.updated_at
+            """, (source.name, source.filename, checksum, staged, matcher))
+
+            self.conn.commit()
+            counts = {'inserted': inserted, 'updated': updated, 'deleted': deleted}
+            logging.info(f"Source {source.name}: {counts}")
+            return counts
+
+        except Exception as e:
+            self.conn.rollback()
+            logging.error(f"Error ingesting source {source.name}: {e}")
+            raise
+
+def iter_report_lines(filename: str, top_n: Optional[int] = None,
+                      coverage: Optional[float] = None) -> Iterator[Tuple[str, int]]:
+    """Yield (word, frequency) for each valid line of a tab-separated frequency report."""
+    for record in FrequencyReport(filename).records(top_n, coverage):
+        yield record.token, record.count
+
+def file_checksum(filename: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class FrequencySource(NamedTuple):
+    """A frequency corpus: its source name in frequency_data, file, and a reader yielding (word, frequency)."""
+    name: str
+    filename: str
+    reader: Callable[[str], Iterable[Tuple[str, int]]] = iter_report_lines
+
+def ingest_sources(db_params: Optional[dict], sources: List[FrequencySource], workers: int = 4,
+                   force: bool = False, include_conjugations: bool = False) -> Dict[str, Optional[Dict[str, int]]]:
+    """Ingest several corpora in parallel, one pooled connection per source.
+
+    Each source is applied in its own transaction; frequency_data rows
+    of different sources never overlap, so they do not block each other.
+    The quiz pool and caches are refreshed once if anything changed.
+    """
+    # Create the bookkeeping table up front so the workers don't race on it
+    with get_pool(db_params).connection() as conn:
+        with conn.cursor() as cur:
+            ensure_frequency_sources(cur)
+
+    def ingest(source: FrequencySource):
+        with FrequencyUpdater(db_params) as updater:
+            return updater.ingest_source(source, force, include_conjugations)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sources)))) as executor:
+        futures = {source.name: executor.submit(ingest, source) for source in sources}
+        results = {name: future.result() for name, future in futures.items()}
+
+    if any(results.values()):
+        with get_pool(db_params).connection() as conn:
+            refresh_quiz_pool(conn)
+            invalidate_all(conn)
+    return results
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load word frequencies into the dictionary database")
+    parser.add_argument('filename', nargs='?', default='word_frequency_report.txt',
+                        help="Tab-separated frequency report (count, word, ...)")
+    parser.add_argument('--set-based', action='store_true',
+                        help="Stage the file with COPY and match/rank in SQL")
+    parser.add_argument('--source', default='web_corpus',
+                        help="Source name stored with the frequencies (--set-based only)")
+    parser.add_argument('--top-n', type=int,
+                        help="Only load the N most frequent words")
+    parser.add_argument('--coverage', type=float,
+                        help="Only load the words covering this percent of the corpus, e.g. 95")
+    parser.add_argument('--conjugations', action='store_true',
+                        help="Also match corpus words against conjugated forms")
+    parser.add_argument('--sources', nargs='+', metavar='NAME=FILE',
+                        help="Incrementally ingest one or more corpora, skipping unchanged files")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="Sources ingested in parallel with --sources")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-ingest --sources even if their checksum is unchanged")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+
     # Database connection parameters from environment variables
-    db_params = {
-        'dbname': os.getenv('DB_NAME'),
-        'user': os.getenv('DB_USER'),
-        'password': os.getenv('DB_PASSWORD'),
-        'host': os.getenv('DB_HOST'),
-        'port': os.getenv('DB_PORT', '5432')
-    }
+    db_params = db_params_from_env()
     
     try:
+        if args.sources:
+            sources = [FrequencySource(*spec.split('=', 1)) for spec in args.sources]
+            results = ingest_sources(db_params, sources, args.workers, args.force, args.conjugations)
+            for name, counts in results.items():
+                logging.info(f"{name}: {counts if counts is not None else 'unchanged'}")
+            logging.info("Frequency update completed successfully")
+            return
+
         with FrequencyUpdater(db_params) as updater:
-            # Read frequency data
-            frequency_data = updater.read_frequency_data('word_frequency_report.txt')
-            
-            # Update database
-            updater.update_frequencies(frequency_data)
+            if args.set_based:
+                updater.update_frequencies_from_file(args.filename, args.source,
+                                                     top_n=args.top_n, coverage=args.coverage,
+                                                     include_conjugations=args.conjugations)
+            else:
+                # Read frequency data
+                frequency_data = updater.read_frequency_data(args.filename, args.top_n, args.coverage)
+
+                # Update database
+                updater.update_frequencies(frequency_data, args.conjugations)
             
         logging.info("Frequency update completed successfully")
         
@@ -1,30 +1,122 @@
+# Order of the generated forms for verbs and adjectives
+VERB_FORMS = (
+    'present',
+    'present_negative',
+    'past',
+    'past_negative',
+    'te_form',
+    'potential',
+    'passive',
+    'causative',
+    'imperative',
+    'volitional'
+)
+
+ADJECTIVE_FORMS = (
+    'present',
+    'present_negative',
+    'past',
+    'past_negative',
+    'te_form',
+    'adverbial'
+)
+
+# Verb group endings
+GODAN_ENDINGS = {
+    'v5u': 'う',
+    'v5k': 'く',
+    'v5g': 'ぐ',
+    'v5s': 'す',
+    'v5t': 'つ',
+    'v5n': 'ぬ',
+    'v5b': 'ぶ',
+    'v5m': 'む',
+    'v5r': 'る'
+}
+
+# Mapping for godan verb stem changes
+GODAN_STEM_MAP = {
+    'う': {'a': 'わ', 'i': 'い', 'e': 'え', 'o': 'お'},
+    'く': {'a': 'か', 'i': 'き', 'e': 'け', 'o': 'こ'},
+    'ぐ': {'a': 'が', 'i': 'ぎ', 'e': 'げ', 'o': 'ご'},
+    'す': {'a': 'さ', 'i': 'し', 'e': 'せ', 'o': 'そ'},
+    'つ': {'a': 'た', 'i': 'ち', 'e': 'て', 'o': 'と'},
+    'ぬ': {'a': 'な', 'i': 'に', 'e': 'ね', 'o': 'の'},
+    'ぶ': {'a': 'ば', 'i': 'び', 'e': 'べ', 'o': 'ぼ'},
+    'む': {'a': 'ま', 'i': 'み', 'e': 'め', 'o': 'も'},
+    'る': {'a': 'ら', 'i': 'り', 'e': 'れ', 'o': 'ろ'}
+}
+
+# Past and te-form endings for godan verbs with sound changes
+GODAN_SOUND_CHANGES = {
+    'む': ('んだ', 'んで'),  # m, b, n-row verbs
+    'ぶ': ('んだ', 'んで'),
+    'ぬ': ('んだ', 'んで'),
+    'つ': ('った', 'って'),  # t, r, u-row verbs
+    'る': ('った', 'って'),
+    'う': ('った', 'って'),
+    'く': ('いた', 'いて'),  # k-row verbs
+    'ぐ': ('いだ', 'いで')   # g-row verbs
+}
+
+# Kuru verb (irregular): (kanji forms, kana forms) in VERB_FORMS order
+KURU_FORMS = (
+    ('来る', '来ない', '来た', '来なかった', '来て', '来られる', '来られる', '来させる', '来い', '来よう'),
+    ('くる', 'こない', 'きた', 'こなかった', 'きて', 'こられる', 'こられる', 'こさせる', 'こい', 'こよう')
+)
+
+def _compile_godan_suffixes(ending):
+    """Build the suffixes added to a godan stem, in VERB_FORMS order after 'present'."""
+    stem_map = GODAN_STEM_MAP[ending]
+    past, te = GODAN_SOUND_CHANGES.get(ending, (stem_map['i'] + 'た', stem_map['i'] + 'て'))
+    return (
+        stem_map['a'] + 'ない',
+        past,
+        stem_map['a'] + 'なかった',
+        te,
+        stem_map['e'] + 'る',
+        stem_map['a'] + 'れる',
+        stem_map['a'] + 'せる',
+        stem_map['e'],
+        stem_map['o'] + 'う'
+    )
+
+# Compiled rules: type -> (forms, characters stripped to get the stem, suffixes after 'present')
+VERB_RULES = {verb_type: (VERB_FORMS, 1, _compile_godan_suffixes(ending))
+              for verb_type, ending in GODAN_ENDINGS.items()}
+VERB_RULES['v1'] = (VERB_FORMS, 1, ('ない', 'た', 'なかった', 'て', 'られる', 'られる', 'させる', 'ろ', 'よう'))
+
+ADJECTIVE_RULES = {
+    'adj-i': (ADJECTIVE_FORMS, 1, ('くない', 'かった', 'くなかった', 'くて', 'く')),
+    'adj-na': (ADJECTIVE_FORMS, 0, ('じゃない', 'だった', 'じゃなかった', 'で', 'に'))
+}
+
+# Types handled by process_dictionary_entry
+VERB_TYPES = frozenset(VERB_RULES) | {'vk'}
+ADJECTIVE_TYPES = frozenset(ADJECTIVE_RULES)
+
+_EMPTY_FORMS = {len(VERB_FORMS): ('',) * len(VERB_FORMS),
+                len(ADJECTIVE_FORMS): ('',) * len(ADJECTIVE_FORMS)}
+
+def _apply_rule(rule, word_kanji, word_kana):
+    """Apply a compiled rule, returning (forms, kanji forms, kana forms)."""
+    forms, strip, suffixes = rule
+    stem_kana = word_kana[:-strip] if strip else word_kana
+    kana = (word_kana,) + tuple(map(stem_kana.__add__, suffixes))
+    if word_kanji:
+        stem_kanji = word_kanji[:-strip] if strip else word_kanji
+        kanji = (word_kanji,) + tuple(map(stem_kanji.__add__, suffixes))
+    else:
+        kanji = _EMPTY_FORMS[len(forms)]
+    return forms, kanji, kana
+
+def _as_dict(forms, kanji, kana):
+    return {form: {'kanji': k, 'kana': n} for form, k, n in zip(forms, kanji, kana)}
+
 class JapaneseConjugator:
     def __init__(self):
-        # Verb group endings
-        self.godan_endings = {
-            'v5u': 'う',
-            'v5k': 'く',
-            'v5g': 'ぐ',
-            'v5s': 'す',
-            'v5t': 'つ',
-            'v5n': 'ぬ',
-            'v5b': 'ぶ',
-            'v5m': 'む',
-            'v5r': 'る'
-        }
-        
-        # Mapping for godan verb stem changes
-        self.godan_stem_map = {
-            'う': {'a': 'わ', 'i': 'い', 'e': 'え', 'o': 'お'},
-            'く': {'a': 'か', 'i': 'き', 'e': 'け', 'o': 'こ'},
-            'ぐ': {'a': 'が', 'i': 'ぎ', 'e': 'げ', 'o': 'ご'},
-            'す': {'a': 'さ', 'i': 'し', 'e': 'せ', 'o': 'そ'},
-            'つ': {'a': 'た', 'i': 'ち', 'e': 'て', 'o': 'と'},
-            'ぬ': {'a': 'な', 'i': 'に', 'e': 'ね', 'o': 'の'},
-            'ぶ': {'a': 'ば', 'i': 'び', 'e': 'べ', 'o': 'ぼ'},
-            'む': {'a': 'ま', 'i': 'み', 'e': 'め', 'o': 'も'},
-            'る': {'a': 'ら', 'i': 'り', 'e': 'れ', 'o': 'ろ'}
-        }
+        self.godan_endings = GODAN_ENDINGS
+        self.godan_stem_map = GODAN_STEM_MAP
 
     def get_verb_stem(self, word, verb_type):
         """Get the stem of a verb based on its type."""
@@ -32,245 +124,162 @@ class JapaneseConjugator:
             return word[:-1]
         return word
 
+    def verb_forms(self, word_kanji, word_kana, verb_type):
+        """Return (forms, kanji forms, kana forms) for a verb, or None if the type isn't supported."""
+        rule = VERB_RULES.get(verb_type)
+        if rule is not None:
+            return _apply_rule(rule, word_kanji, word_kana)
+        if verb_type == 'vk' and word_kana == 'くる':
+            return (VERB_FORMS, *KURU_FORMS)
+        return None
+
+    def adjective_forms(self, word_kanji, word_kana, adj_type):
+        """Return (forms, kanji forms, kana forms) for an adjective, or None if the type isn't supported."""
+        rule = ADJECTIVE_RULES.get(adj_type)
+        if rule is not None:
+            return _apply_rule(rule, word_kanji, word_kana)
+        return None
+
     def conjugate_verb(self, word_kanji, word_kana, verb_type):
         """Generate conjugations for a verb with both kanji and kana forms."""
-        conjugations = {}
-        
-        # Get the basic stems
-        stem_kanji = self.get_verb_stem(word_kanji, verb_type) if word_kanji else ""
-        stem_kana = self.get_verb_stem(word_kana, verb_type)
-        
-        if verb_type in self.godan_endings:  # Godan verbs
-            ending_kanji = word_kanji[-1] if word_kanji else ""
-            ending_kana = word_kana[-1]
-            stem_map = self.godan_stem_map[ending_kana]  # Use kana ending for mapping
-            
-            # Special conjugation rules for certain verb endings
-            if ending_kana in ['む', 'ぶ', 'ぬ']:  # m, b, n-row verbs
-                past_kanji = stem_kanji + 'んだ' if word_kanji else ""
-                past_kana = stem_kana + 'んだ'
-                te_kanji = stem_kanji + 'んで' if word_kanji else ""
-                te_kana = stem_kana + 'んで'
-            elif ending_kana in ['つ', 'る', 'う']:  # t, r, u-row verbs
-                past_kanji = stem_kanji + 'った' if word_kanji else ""
-                past_kana = stem_kana + 'った'
-                te_kanji = stem_kanji + 'って' if word_kanji else ""
-                te_kana = stem_kana + 'って'
-            elif ending_kana == 'く':  # k-row verbs
-                past_kanji = stem_kanji + 'いた' if word_kanji else ""
-                past_kana = stem_kana + 'いた'
-                te_kanji = stem_kanji + 'いて' if word_kanji else ""
-                te_kana = stem_kana + 'いて'
-            elif ending_kana == 'ぐ':  # g-row verbs
-                past_kanji = stem_kanji + 'いだ' if word_kanji else ""
-                past_kana = stem_kana + 'いだ'
-                te_kanji = stem_kanji + 'いで' if word_kanji else ""
-                te_kana = stem_kana + 'いで'
-            else:
-                past_kanji = stem_kanji + stem_map['i'] + 'た' if word_kanji else ""
-                past_kana = stem_kana + stem_map['i'] + 'た'
-                te_kanji = stem_kanji + stem_map['i'] + 'て' if word_kanji else ""
-                te_kana = stem_kana + stem_map['i'] + 'て'
-            
-            conjugations.update({
-                'present': {'kanji': word_kanji, 'kana': word_kana},
-                'present_negative': {
-                    'kanji': stem_kanji + stem_map['a'] + 'ない' if word_kanji else "",
-                    'kana': stem_kana + stem_map['a'] + 'ない'
-                },
-                'past': {
-                    'kanji': past_kanji,
-                    'kana': past_kana
-                },
-                'past_negative': {
-                    'kanji': stem_kanji + stem_map['a'] + 'なかった' if word_kanji else "",
-                    'kana': stem_kana + stem_map['a'] + 'なかった'
-                },
-                'te_form': {
-                    'kanji': te_kanji,
-                    'kana': te_kana
-                },
-                'potential': {
-                    'kanji': stem_kanji + stem_map['e'] + 'る' if word_kanji else "",
-                    'kana': stem_kana + stem_map['e'] + 'る'
-                },
-                'passive': {
-                    'kanji': stem_kanji + stem_map['a'] + 'れる' if word_kanji else "",
-                    'kana': stem_kana + stem_map['a'] + 'れる'
-                },
-                'causative': {
-                    'kanji': stem_kanji + stem_map['a'] + 'せる' if word_kanji else "",
-                    'kana': stem_kana + stem_map['a'] + 'せる'
-                },
-                'imperative': {
-                    'kanji': stem_kanji + stem_map['e'] if word_kanji else "",
-                    'kana': stem_kana + stem_map['e']
-                },
-                'volitional': {
-                    'kanji': stem_kanji + stem_map['o'] + 'う' if word_kanji else "",
-                    'kana': stem_kana + stem_map['o'] + 'う'
-                }
-            })
-            
-        elif verb_type == 'v1':  # Ichidan verbs
-            conjugations.update({
-                'present': {'kanji': word_kanji, 'kana': word_kana},
-                'present_negative': {
-                    'kanji': stem_kanji + 'ない' if word_kanji else "",
-                    'kana': stem_kana + 'ない'
-                },
-                'past': {
-                    'kanji': stem_kanji + 'た' if word_kanji else "",
-                    'kana': stem_kana + 'た'
-                },
-                'past_negative': {
-                    'kanji': stem_kanji + 'なかった' if word_kanji else "",
-                    'kana': stem_kana + 'なかった'
-                },
-                'te_form': {
-                    'kanji': stem_kanji + 'て' if word_kanji else "",
-                    'kana': stem_kana + 'て'
-                },
-                'potential': {
-                    'kanji': stem_kanji + 'られる' if word_kanji else "",
-                    'kana': stem_kana + 'られる'
-                },
-                'passive': {
-                    'kanji': stem_kanji + 'られる' if word_kanji else "",
-                    'kana': stem_kana + 'られる'
-                },
-                'causative': {
-                    'kanji': stem_kanji + 'させる' if word_kanji else "",
-                    'kana': stem_kana + 'させる'
-                },
-                'imperative': {
-                    'kanji': stem_kanji + 'ろ' if word_kanji else "",
-                    'kana': stem_kana + 'ろ'
-                },
-                'volitional': {
-                    'kanji': stem_kanji + 'よう' if word_kanji else "",
-                    'kana': stem_kana + 'よう'
-                }
-            })
-            
-        elif verb_type == 'vk':  # Kuru verb (irregular)
-            if word_kana == 'くる':
-                conjugations.update({
-                    'present': {'kanji': '来る', 'kana': 'くる'},
-                    'present_negative': {'kanji': '来ない', 'kana': 'こない'},
-                    'past': {'kanji': '来た', 'kana': 'きた'},
-                    'past_negative': {'kanji': '来なかった', 'kana': 'こなかった'},
-                    'te_form': {'kanji': '来て', 'kana': 'きて'},
-                    'potential': {'kanji': '来られる', 'kana': 'こられる'},
-                    'passive': {'kanji': '来られる', 'kana': 'こられる'},
-                    'causative': {'kanji': '来させる', 'kana': 'こさせる'},
-                    'imperative': {'kanji': '来い', 'kana': 'こい'},
-                    'volitional': {'kanji': '来よう', 'kana': 'こよう'}
-                })
-
-        return conjugations
+        result = self.verb_forms(word_kanji, word_kana, verb_type)
+        return _as_dict(*result) if result else {}
 
     def conjugate_adjective(self, word_kanji, word_kana, adj_type):
         """Generate conjugations for an adjective with both kanji and kana forms."""
-        conjugations = {}
-        
-        if adj_type == 'adj-i':  # i-adjectives
-            stem_kanji = word_kanji[:-1] if word_kanji else ""  # Remove い
-            stem_kana = word_kana[:-1]  # Remove い
-            
-            conjugations.update({
-                'present': {'kanji': word_kanji, 'kana': word_kana},
-                'present_negative': {
-                    'kanji': stem_kanji + 'くない' if word_kanji else "",
-                    'kana': stem_kana + 'くない'
-                },
-                'past': {
-                    'kanji': stem_kanji + 'かった' if word_kanji else "",
-                    'kana': stem_kana + 'かった'
-                },
-                'past_negative': {
-                    'kanji': stem_kanji + 'くなかった' if word_kanji else "",
-                    'kana': stem_kana + 'くなかった'
-                },
-                'te_form': {
-                    'kanji': stem_kanji + 'くて' if word_kanji else "",
-                    'kana': stem_kana + 'くて'
-                },
-                'adverbial': {
-                    'kanji': stem_kanji + 'く' if word_kanji else "",
-                    'kana': stem_kana + 'く'
-                }
-            })
-            
-        elif adj_type == 'adj-na':  # na-adjectives
-            conjugations.update({
-                'present': {'kanji': word_kanji, 'kana': word_kana},
-                'present_negative': {
-                    'kanji': word_kanji + 'じゃない' if word_kanji else "",
-                    'kana': word_kana + 'じゃない'
-                },
-                'past': {
-                    'kanji': word_kanji + 'だった' if word_kanji else "",
-                    'kana': word_kana + 'だった'
-                },
-                'past_negative': {
-                    'kanji': word_kanji + 'じゃなかった' if word_kanji else "",
-                    'kana': word_kana + 'じゃなかった'
-                },
-                'te_form': {
-                    'kanji': word_kanji + 'で' if word_kanji else "",
-                    'kana': word_kana + 'で'
-                },
-                'adverbial': {
-                    'kanji': word_kanji + 'に' if word_kanji else "",
-                    'kana': word_kana + 'に'
-                }
-            })
-            
-        return conjugations
+        result = self.adjective_forms(word_kanji, word_kana, adj_type)
+        return _as_dict(*result) if result else {}
 
-def process_dictionary_entry(entry):
-    """Process a dictionary entry and return conjugations if applicable."""
-    conjugator = JapaneseConjugator()
-    results = []
-    
+    def conjugate_columns(self, kanji, kana, types):
+        """Conjugate whole word lists given as parallel kanji, kana and type columns.
+
+        Words are grouped by type and each group is conjugated in a single
+        pass. Returns {type: {'indices', 'forms', 'kanji', 'kana'}} where
+        'indices' are positions in the input columns and 'kanji'/'kana' map
+        each form to a list aligned with 'indices'. Words of unsupported
+        types are left out.
+        """
+        groups = {}
+        for i, word_type in enumerate(types):
+            groups.setdefault(word_type, []).append(i)
+
+        results = {}
+        for word_type, indices in groups.items():
+            rule = VERB_RULES.get(word_type) or ADJECTIVE_RULES.get(word_type)
+            if rule is not None:
+                forms, strip, suffixes = rule
+                kana_words = [kana[i] for i in indices]
+                kanji_words = [kanji[i] for i in indices]
+                kana_stems = [word[:-strip] for word in kana_words] if strip else kana_words
+                kanji_stems = [word[:-strip] for word in kanji_words] if strip else kanji_words
+                kana_columns = {forms[0]: kana_words}
+                kanji_columns = {forms[0]: kanji_words}
+                for form, suffix in zip(forms[1:], suffixes):
+                    kana_columns[form] = [stem + suffix for stem in kana_stems]
+                    kanji_columns[form] = [stem + suffix if word else ''
+                                           for stem, word in zip(kanji_stems, kanji_words)]
+            elif word_type == 'vk':
+                indices = [i for i in indices if kana[i] == 'くる']
+                if not indices:
+                    continue
+                forms = VERB_FORMS
+                kanji_columns = {form: [k] * len(indices) for form, k in zip(forms, KURU_FORMS[0])}
+                kana_columns = {form: [k] * len(indices) for form, k in zip(forms, KURU_FORMS[1])}
+            else:
+                continue
+            results[word_type] = {
+                'indices': indices,
+                'forms': forms,
+                'kanji': kanji_columns,
+                'kana': kana_columns
+            }
+        return results
+
+class ConjugationResult:
+    """Compact conjugation result for one word and type.
+
+    Forms are stored as two fixed-order tuples (kanji and kana) aligned
+    with `forms`, which is the shared VERB_FORMS/ADJECTIVE_FORMS tuple.
+    """
+
+    __slots__ = ('kanji', 'kana', 'type', 'forms', 'kanji_forms', 'kana_forms')
+
+    def __init__(self, kanji, kana, conj_type, forms, kanji_forms, kana_forms):
+        self.kanji = kanji
+        self.kana = kana
+        self.type = conj_type
+        self.forms = forms
+        self.kanji_forms = kanji_forms
+        self.kana_forms = kana_forms
+
+    def __getitem__(self, form):
+        """Return the (kanji, kana) pair for a form name."""
+        try:
+            index = self.forms.index(form)
+        except ValueError:
+            raise KeyError(form) from None
+        return self.kanji_forms[index], self.kana_forms[index]
+
+    def __repr__(self):
+        return f"ConjugationResult({self.kanji!r}, {self.kana!r}, {self.type!r})"
+
+    def to_dict(self):
+        """Convert to the dict shape returned by process_dictionary_entry."""
+        return {
+            'word': {'kanji': self.kanji, 'kana': self.kana},
+            'type': self.type,
+            'conjugations': _as_dict(self.forms, self.kanji_forms, self.kana_forms)
+        }
+
+# Shared engine; the conjugator holds no per-call state
+_conjugator = JapaneseConjugator()
+
+def get_conjugator():
+    """Return the shared JapaneseConjugator instance."""
+    return _conjugator
+
+def conjugate_many(words):
+    """Conjugate a sequence of (kanji, kana, type) tuples; see JapaneseConjugator.conjugate_columns."""
+    if not words:
+        return {}
+    kanji, kana, types = zip(*words)
+    return _conjugator.conjugate_columns(kanji, kana, types)
+
+def iter_entry_forms(entry):
+    """Yield (word kanji, word kana, type, forms, kanji forms, kana forms) for each conjugable type of an entry."""
     # Get both kanji and kana forms
     kanji = entry.get('kanji', [])
     kana = entry.get('kana', [])
     word_kanji = kanji[0]['text'] if kanji else ""
     word_kana = kana[0]['text'] if kana else ""
     
-    # Collect all unique parts of speech across all senses
-    all_pos = set()
+    # Collect all unique parts of speech across all senses, in order of appearance
+    all_pos = {}
     for sense in entry.get('sense', []):
-        all_pos.update(sense.get('partOfSpeech', []))
-    
-    # Process unique verb types
-    verb_types = {p for p in all_pos if p.startswith('v') and 
-                 p in ['v5u', 'v5k', 'v5g', 'v5s', 'v5t', 'v5n', 'v5b', 'v5m', 'v5r', 'v1', 'vk']}
-    
-    # Process unique adjective types
-    adj_types = {p for p in all_pos if p.startswith('adj') and 
-                p in ['adj-i', 'adj-na']}
+        all_pos.update(dict.fromkeys(sense.get('partOfSpeech', [])))
     
-    # Generate conjugations for each unique type
-    for verb_type in verb_types:
-        conjugations = conjugator.conjugate_verb(word_kanji, word_kana, verb_type)
-        results.append({
-            'word': {'kanji': word_kanji, 'kana': word_kana},
-            'type': verb_type,
-            'conjugations': conjugations
-        })
+    # Generate conjugations for each unique type, verbs before adjectives
+    for verb_type in [p for p in all_pos if p in VERB_TYPES]:
+        result = _conjugator.verb_forms(word_kanji, word_kana, verb_type)
+        yield (word_kanji, word_kana, verb_type) + (result or ((), (), ()))
             
-    for adj_type in adj_types:
-        conjugations = conjugator.conjugate_adjective(word_kanji, word_kana, adj_type)
-        results.append({
-            'word': {'kanji': word_kanji, 'kana': word_kana},
-            'type': adj_type,
-            'conjugations': conjugations
-        })
-                
-    return results
+    for adj_type in [p for p in all_pos if p in ADJECTIVE_TYPES]:
+        result = _conjugator.adjective_forms(word_kanji, word_kana, adj_type)
+        yield (word_kanji, word_kana, adj_type) + (result or ((), (), ()))
+
+def process_dictionary_entry(entry, compact=False):
+    """Process a dictionary entry and return conjugations if applicable.
+
+    With compact=True the results are ConjugationResult records instead
+    of nested dicts; call to_dict() on them to get the dict shape.
+    """
+    if compact:
+        return [ConjugationResult(*result) for result in iter_entry_forms(entry)]
+    return [{
+        'word': {'kanji': word_kanji, 'kana': word_kana},
+        'type': conj_type,
+        'conjugations': _as_dict(forms, kanji, kana)
+    } for word_kanji, word_kana, conj_type, forms, kanji, kana in iter_entry_forms(entry)]
 
 if __name__ == "__main__":
     import json
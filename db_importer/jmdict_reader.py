@@ -0,0 +1,125 @@
+import codecs
+import json
+from typing import Any, Dict, Iterator
+
+# Amount of raw bytes pulled from the file per read
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = ' \t\n\r'
+
+
+class JMdictReader:
+    """Incrementally read entries from a jmdict-simplified JSON file.
+
+    Only the entry currently being decoded is held in memory, so peak
+    memory stays flat regardless of the size of the dictionary.
+    """
+
+    def __init__(self, filename: str, chunk_size: int = CHUNK_SIZE):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.metadata: Dict[str, Any] = {}
+        # Raw bytes read from the file so far (ahead of the last entry by up to a chunk)
+        self.bytes_read = 0
+        self._decoder = json.JSONDecoder()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with open(self.filename, 'rb') as f:
+            yield from self._iter_words(f)
+
+    def _iter_words(self, f) -> Iterator[Dict[str, Any]]:
+        self._file = f
+        self._text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self.bytes_read = 0
+
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(':')
+            if key == 'words':
+                yield from self._iter_array()
+            else:
+                self.metadata[key] = self._decode_value()
+            if self._next_token() == '}':
+                return
+            self._back_up()
+            self._expect(',')
+
+    def _iter_array(self) -> Iterator[Dict[str, Any]]:
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            token = self._next_token()
+            if token == ']':
+                return
+            if token != ',':
+                raise ValueError(f"Malformed JMdict words array near offset {self._pos}")
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; return False at end of file."""
+        if self._eof:
+            return False
+        raw = self._file.read(self.chunk_size)
+        self.bytes_read += len(raw)
+        if not raw:
+            self._eof = True
+            self._buf += self._text_decoder.decode(b'', final=True)
+            return False
+        # Drop the already consumed text so the buffer stays small
+        self._buf = self._buf[self._pos:] + self._text_decoder.decode(raw)
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf) or not self._fill():
+                return
+
+    def _peek(self) -> str:
+        self._skip_whitespace()
+        if self._pos >= len(self._buf):
+            raise ValueError("Unexpected end of JMdict file")
+        return self._buf[self._pos]
+
+    def _next_token(self) -> str:
+        token = self._peek()
+        self._pos += 1
+        return token
+
+    def _back_up(self) -> None:
+        self._pos -= 1
+
+    def _expect(self, token: str) -> None:
+        found = self._next_token()
+        if found != token:
+            raise ValueError(f"Expected {token!r} in JMdict file, found {found!r}")
+
+    def _decode_value(self) -> Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A value ending exactly at the buffer edge may be truncated (e.g. a number)
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def iter_entries(filename: str) -> Iterator[Dict[str, Any]]:
+    """Yield JMdict entries one at a time from the given file."""
+    return iter(JMdictReader(filename))
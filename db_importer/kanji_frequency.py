@@ -0,0 +1,155 @@
+import argparse
+import io
+import logging
+from itertools import groupby
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from bulk_loader import copy_line
+from frequency_report import FrequencyReport
+from lookup_cache import invalidate_all
+
+KANJI_TABLES_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS kanji_frequency (
+        kanji TEXT PRIMARY KEY,
+        count BIGINT NOT NULL,
+        rank INTEGER NOT NULL,
+        dense_rank INTEGER,
+        coverage NUMERIC
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS kanji_difficulty (
+        entry_id TEXT PRIMARY KEY REFERENCES entries(id),
+        max_rank INTEGER NOT NULL,
+        mean_rank REAL NOT NULL,
+        kanji_count INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_kanji_difficulty_max_rank ON kanji_difficulty(max_rank)",
+)
+
+def is_kanji(char: str) -> bool:
+    """CJK unified ideographs, including extension A and the 々 repeat mark."""
+    return '\u4e00' <= char <= '\u9fff' or '\u3400' <= char <= '\u4dbf' or char == '\u3005'
+
+class KanjiInfo(NamedTuple):
+    count: int
+    rank: int
+    dense_rank: Optional[int]
+    coverage: Optional[float]
+
+class KanjiIndex:
+    """Kanji → rank and cumulative corpus coverage, from a kanji frequency report.
+
+    Kanji missing from the report get `unknown_rank`, one past the
+    rarest kanji, so they always count as the hardest.
+    """
+
+    def __init__(self, kanji: Dict[str, KanjiInfo]):
+        self.kanji = kanji
+        self.ranks = {char: info.rank for char, info in kanji.items()}
+        self.unknown_rank = max(self.ranks.values(), default=0) + 1
+
+    def __len__(self) -> int:
+        return len(self.kanji)
+
+    def __contains__(self, char: str) -> bool:
+        return char in self.kanji
+
+    def get(self, char: str) -> Optional[KanjiInfo]:
+        return self.kanji.get(char)
+
+    def rank(self, char: str) -> int:
+        return self.ranks.get(char, self.unknown_rank)
+
+    @classmethod
+    def from_report(cls, filename: str) -> 'KanjiIndex':
+        """Load a kanji report (count, kanji, dense rank, rank, percent, cumulative percent)."""
+        kanji = {}
+        for i, record in enumerate(FrequencyReport(filename)):
+            rank = record.rank if record.rank is not None else i + 1
+            kanji[record.token] = KanjiInfo(record.count, rank, record.dense_rank,
+                                            record.cumulative_percent)
+        return cls(kanji)
+
+    def difficulty(self, forms: Iterable[str]) -> Optional[Tuple[int, float, int]]:
+        """(max rank, mean rank, kanji count) over the distinct kanji of some writing forms.
+
+        Returns None when the forms contain no kanji.
+        """
+        ranks = [self.rank(char) for char in {c for form in forms for c in form if is_kanji(c)}]
+        if not ranks:
+            return None
+        return max(ranks), sum(ranks) / len(ranks), len(ranks)
+
+def load_kanji_frequency(conn, index: KanjiIndex) -> int:
+    """Replace the kanji_frequency table with the index contents using COPY."""
+    rows = [copy_line((char, info.count, info.rank, info.dense_rank, info.coverage))
+            for char, info in index.kanji.items()]
+    with conn.cursor() as cur:
+        for ddl in KANJI_TABLES_DDL:
+            cur.execute(ddl)
+        cur.execute("DELETE FROM kanji_frequency")
+        cur.copy_expert("COPY kanji_frequency (kanji, count, rank, dense_rank, coverage) FROM STDIN",
+                        io.StringIO(''.join(rows)))
+    conn.commit()
+    return len(rows)
+
+def refresh_kanji_difficulty(conn, index: KanjiIndex, batch_rows: int = 50000,
+                             itersize: int = 50000) -> int:
+    """Score every entry's kanji writing forms in one streaming pass and store them with COPY.
+
+    Entries without kanji get no row. Runs in a single transaction, so
+    readers see either the old or the new scores.
+    """
+    def copy_batch(cur, batch: List[str]) -> None:
+        cur.copy_expert("COPY kanji_difficulty (entry_id, max_rank, mean_rank, kanji_count) FROM STDIN",
+                        io.StringIO(''.join(batch)))
+
+    count = 0
+    with conn.cursor() as cur:
+        for ddl in KANJI_TABLES_DDL:
+            cur.execute(ddl)
+        cur.execute("DELETE FROM kanji_difficulty")
+        with conn.cursor(name='kanji_forms') as forms:
+            forms.itersize = itersize
+            forms.execute("""
+                SELECT entry_id, form_text
+                FROM writing_forms
+                WHERE form_type = 'kanji'
+                ORDER BY entry_id
+            """)
+            batch = []
+            for entry_id, rows in groupby(forms, key=lambda row: row[0]):
+                score = index.difficulty(form_text for _, form_text in rows)
+                if score is None:
+                    continue
+                batch.append(copy_line((entry_id, *score)))
+                if len(batch) >= batch_rows:
+                    copy_batch(cur, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                copy_batch(cur, batch)
+                count += len(batch)
+        cur.execute("ANALYZE kanji_difficulty")
+    conn.commit()
+    return count
+
+def main():
+    from db_pool import db_params_from_env, get_pool
+
+    parser = argparse.ArgumentParser(description="Load kanji frequencies and score entries by kanji difficulty")
+    parser.add_argument('filename', nargs='?', default='kanji_freq_report.txt',
+                        help="Kanji frequency report")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    index = KanjiIndex.from_report(args.filename)
+    with get_pool(db_params_from_env()).connection() as conn:
+        logging.info(f"Loaded {load_kanji_frequency(conn, index)} kanji")
+        logging.info(f"Scored {refresh_kanji_difficulty(conn, index)} entries")
+        invalidate_all(conn)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Every live cache, so imports can invalidate them all at once
+_caches = weakref.WeakSet()
+
+# Single-row counter bumped by every import or frequency update, so caches in
+# other processes can tell that the dictionary changed
+DICTIONARY_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS dictionary_version (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version BIGINT NOT NULL,
+        updated_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+"""
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional time-to-live per entry."""
+
+    def __init__(self, maxsize: int = 10000, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires = item
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader() on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = loader()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+def bump_dictionary_version(cur) -> None:
+    cur.execute(DICTIONARY_VERSION_DDL)
+    cur.execute("""
+        INSERT INTO dictionary_version (id, version) VALUES (TRUE, 1)
+        ON CONFLICT (id) DO UPDATE
+        SET version = dictionary_version.version + 1, updated_at = now()
+    """)
+
+def read_dictionary_version(cur) -> int:
+    """Current dictionary version, or 0 if nothing has bumped it yet."""
+    cur.execute("SELECT to_regclass('dictionary_version') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return 0
+    cur.execute("SELECT version FROM dictionary_version")
+    row = cur.fetchone()
+    return row[0] if row else 0
+
+def invalidate_all(conn=None) -> None:
+    """Clear every cache in this process, e.g. after an import or frequency update.
+
+    With a connection, also bump dictionary_version (and commit) so
+    caches in other processes drop their entries on their next check.
+    """
+    if conn is not None:
+        with conn.cursor() as cur:
+            bump_dictionary_version(cur)
+        conn.commit()
+    for cache in list(_caches):
+        cache.clear()
+
+class VersionWatcher:
+    """Poll dictionary_version at most every `interval` seconds.
+
+    changed() returns True once for each new version seen after the
+    first check.
+    """
+
+    def __init__(self, read_version: Callable[[], int], interval: float = 5.0):
+        self.read_version = read_version
+        self.interval = interval
+        self.version: Optional[int] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def changed(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.interval:
+                return False
+            self._checked_at = now
+            previous = self.version
+        version = self.read_version()
+        with self._lock:
+            self.version = version
+        return previous is not None and version != previous
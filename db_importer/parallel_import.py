@@ -0,0 +1,113 @@
+import multiprocessing
+from collections import deque
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from db_pool import get_pool
+from bulk_loader import BulkLoader, COPY_COLUMNS, next_sense_id, sync_sense_sequence
+from entry_fingerprints import reset_fingerprints
+from import_checkpoint import ImportBatchLog
+from jmdict_reader import iter_entries
+
+# Connection and batch log owned by each worker process, set up by the pool initializer
+_worker_conn = None
+_batch_log = None
+_base_sense_id = None
+
+def _init_worker(db_params: dict, batch_log: ImportBatchLog, base_sense_id: int) -> None:
+    global _worker_conn, _batch_log, _base_sense_id
+    _worker_conn = get_pool(db_params).getconn()
+    _batch_log = batch_log
+    _base_sense_id = base_sense_id
+
+def _load_batch(task: Tuple[int, int, List[Dict[str, Any]]]) -> Dict[str, int]:
+    """Conjugate and COPY one batch of entries on this worker's connection."""
+    batch_no, first_sense_id, entries = task
+    loader = BulkLoader(_worker_conn, first_sense_id=first_sense_id)
+    try:
+        for entry in entries:
+            loader.add_entry(entry)
+        loader.flush()
+        # Record the batch in the same transaction, so it is logged only if its rows are in
+        with _worker_conn.cursor() as cur:
+            _batch_log.save(cur, batch_no, _base_sense_id)
+        _worker_conn.commit()
+    except Exception:
+        _worker_conn.rollback()
+        raise
+    return loader.row_counts
+
+def iter_batches(entries, batch_size: int, first_sense_id: int) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """Group entries into batches, each with its own reserved range of sense IDs."""
+    batch = []
+    sense_count = 0
+    for entry in entries:
+        batch.append(entry)
+        sense_count += len(entry.get('sense', []))
+        if len(batch) >= batch_size:
+            yield first_sense_id, batch
+            first_sense_id += sense_count
+            batch = []
+            sense_count = 0
+    if batch:
+        yield first_sense_id, batch
+
+def parallel_import(db_params: dict, filename: str, workers: Optional[int] = None,
+                    batch_size: int = 2000, restart: bool = False) -> Dict[str, int]:
+    """Import a JMdict file through a pool of worker processes.
+
+    The parent streams entries and reserves a block of sense IDs for each
+    batch up front. Workers build rows (including conjugations) and COPY
+    them over their own connection, so batches never conflict. The
+    dictionary tables should be empty beforehand.
+
+    Each batch commits on its own and is recorded in import_batches. If
+    the load is interrupted, rerun it with the same file and batch size:
+    committed batches are skipped and only the missing ones are loaded.
+    To start over instead, empty the dictionary tables and pass restart=True;
+    stored entry fingerprints are replaced by a new (not a resumed) load.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    row_counts = {table: 0 for table in COPY_COLUMNS}
+    batch_log = ImportBatchLog(filename, batch_size)
+
+    conn_pool = get_pool(db_params)
+    conn = conn_pool.getconn()
+    try:
+        if restart:
+            batch_log.clear(conn)
+        first_sense_id, committed = batch_log.load(conn)
+        if first_sense_id is None:
+            with conn.cursor() as cur:
+                # Done here, once, so the workers don't race on it; a resumed
+                # load keeps the fingerprints its committed batches wrote
+                reset_fingerprints(cur)
+                first_sense_id = next_sense_id(cur)
+            conn.commit()
+        else:
+            print(f"Resuming: {len(committed)} batches already committed")
+
+        initargs = (db_params, batch_log, first_sense_id)
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            # Bound the number of queued batches so the parent doesn't read ahead unboundedly
+            pending = deque()
+            batches = iter_batches(iter_entries(filename), batch_size, first_sense_id)
+            for i, (batch_sense_id, batch) in enumerate(batches, 1):
+                if i in committed:
+                    continue
+                pending.append(pool.apply_async(_load_batch, ((i, batch_sense_id, batch),)))
+                if len(pending) >= workers * 2:
+                    _collect(pending.popleft(), row_counts)
+                if i % 10 == 0:
+                    print(f"Dispatched {i * batch_size} entries")
+            while pending:
+                _collect(pending.popleft(), row_counts)
+
+        with conn.cursor() as cur:
+            sync_sense_sequence(cur)
+        conn.commit()
+    finally:
+        conn_pool.putconn(conn)
+    return row_counts
+
+def _collect(result, row_counts: Dict[str, int]) -> None:
+    for table, count in result.get().items():
+        row_counts[table] += count
@@ -1,46 +1,53 @@
+import re
 from typing import Dict, List, Any, Optional
-import psycopg2
 from psycopg2.extras import RealDictCursor
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from db_pool import ConnectionPool, db_params_from_env, get_pool
+from lookup_cache import LRUCache, VersionWatcher, read_dictionary_version
+from autocomplete import AutocompleteIndex
 
 class JapaneseDictionary:
-    def __init__(self):
-        self.db_params = {
-            'dbname': os.getenv('DB_NAME'),
-            'user': os.getenv('DB_USER'),
-            'password': os.getenv('DB_PASSWORD'),
-            'host': os.getenv('DB_HOST'),
-            'port': os.getenv('DB_PORT', '5432')
-        }
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.db_params = db_params_from_env()
+        self.pool = pool or get_pool(self.db_params)
+        self.autocomplete_index: Optional[AutocompleteIndex] = None
     
     def _get_connection(self):
-        """Get a database connection with RealDictCursor for named columns."""
-        return psycopg2.connect(**self.db_params, cursor_factory=RealDictCursor)
+        """Check out a pooled database connection (returned when the block exits)."""
+        return self.pool.connection()
     
     def lookup_word(self, text: str) -> Dict[str, Any]:
         """Look up a word by its kanji or kana form."""
+        return self.lookup_words([text])[text]
+    
+    def lookup_words(self, texts: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up several words at once, returning {text: lookup_word(text)}.
+        
+        Matching entries are fetched in one query, then senses, conjugations
+        and examples for all of them are fetched with one query each.
+        """
+        texts = list(dict.fromkeys(texts))
+        lookups = {text: {} for text in texts}
+        if not texts:
+            return lookups
+        
         with self._get_connection() as conn:
-            with conn.cursor() as cur:
-                # Get basic word information
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                # Get basic word information for every matching entry
                 cur.execute("""
-                    SELECT DISTINCT e.id, e.is_common,
+                    SELECT DISTINCT w2.form_text as query, e.id, e.is_common,
                            wf.form_text, wf.form_type, wf.is_common as form_common
-                    FROM entries e
+                    FROM writing_forms w2
+                    JOIN entries e ON e.id = w2.entry_id
                     JOIN writing_forms wf ON e.id = wf.entry_id
-                    WHERE EXISTS (
-                        SELECT 1 FROM writing_forms w2
-                        WHERE w2.entry_id = e.id AND w2.form_text = %s
-                    )
-                """, (text,))
+                    WHERE w2.form_text = ANY(%s)
+                    ORDER BY e.id, wf.form_type DESC, wf.form_text
+                """, (texts,))
                 
-                results = {}
+                entries = {}
                 for row in cur.fetchall():
                     entry_id = row['id']
-                    if entry_id not in results:
-                        results[entry_id] = {
+                    if entry_id not in entries:
+                        entries[entry_id] = {
                             'id': entry_id,
                             'is_common': row['is_common'],
                             'writing_forms': [],
@@ -48,84 +55,238 @@ class JapaneseDictionary:
                             'conjugations': [],
                             'examples': []
                         }
+                    results = lookups[row['query']]
+                    if entry_id not in results:
+                        results[entry_id] = entries[entry_id]
                     
-                    # Add writing form
-                    results[entry_id]['writing_forms'].append({
+                    # Add writing form (once, even if several queries matched the entry)
+                    form = {
                         'text': row['form_text'],
                         'type': row['form_type'],
                         'is_common': row['form_common']
-                    })
+                    }
+                    if form not in entries[entry_id]['writing_forms']:
+                        entries[entry_id]['writing_forms'].append(form)
                 
-                # If we found any results, get additional information
-                for entry_id in results:
-                    # Get senses (meanings)
-                    cur.execute("""
-                        SELECT s.id, s.sense_order,
-                               array_agg(DISTINCT sp.pos) as pos,
-                               array_agg(DISTINCT sf.field) as fields,
-                               array_agg(DISTINCT g.gloss) as glosses
-                        FROM senses s
-                        LEFT JOIN sense_pos sp ON s.id = sp.sense_id
-                        LEFT JOIN sense_fields sf ON s.id = sf.sense_id
-                        LEFT JOIN glosses g ON s.id = g.sense_id
-                        WHERE s.entry_id = %s
-                        GROUP BY s.id, s.sense_order
-                        ORDER BY s.sense_order
-                    """, (entry_id,))
-                    
-                    results[entry_id]['senses'] = [dict(row) for row in cur.fetchall()]
-                    
-                    # Get conjugations
-                    cur.execute("""
-                        SELECT conjugation_type, form, kanji, kana
-                        FROM conjugations
-                        WHERE entry_id = %s
-                        ORDER BY conjugation_type, form
-                    """, (entry_id,))
-                    
-                    results[entry_id]['conjugations'] = [dict(row) for row in cur.fetchall()]
-                    
-                    # Get examples
-                    cur.execute("""
-                        SELECT japanese, english
-                        FROM examples
-                        WHERE entry_id = %s
-                    """, (entry_id,))
-                    
-                    results[entry_id]['examples'] = [dict(row) for row in cur.fetchall()]
-                
-                return results
+                self._add_entry_details(cur, entries)
+                return lookups
+    
+    def _add_entry_details(self, cur, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Fill in senses, conjugations and examples for a set of entries with one query each."""
+        if not entries:
+            return
+        entry_ids = list(entries)
+        
+        self._add_senses(cur, entries)
+        
+        # Get conjugations
+        cur.execute("""
+            SELECT entry_id, conjugation_type, form, kanji, kana
+            FROM conjugations
+            WHERE entry_id = ANY(%s)
+            ORDER BY entry_id, conjugation_type, form
+        """, (entry_ids,))
+        for row in cur.fetchall():
+            row = dict(row)
+            entries[row.pop('entry_id')]['conjugations'].append(row)
+        
+        # Get examples
+        cur.execute("""
+            SELECT entry_id, japanese, english
+            FROM examples
+            WHERE entry_id = ANY(%s)
+            ORDER BY entry_id, id
+        """, (entry_ids,))
+        for row in cur.fetchall():
+            row = dict(row)
+            entries[row.pop('entry_id')]['examples'].append(row)
+    
+    def _add_senses(self, cur, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Fill in the senses (meanings) for a set of entries with one query.
+        
+        pos, fields and glosses are de-duplicated and sorted by code point,
+        and are empty lists (not [None]) when a sense has none.
+        """
+        cur.execute("""
+            SELECT s.entry_id, s.id, s.sense_order,
+                   array_remove(array_agg(DISTINCT sp.pos COLLATE "C" ORDER BY sp.pos COLLATE "C"), NULL) as pos,
+                   array_remove(array_agg(DISTINCT sf.field COLLATE "C" ORDER BY sf.field COLLATE "C"), NULL) as fields,
+                   array_remove(array_agg(DISTINCT g.gloss COLLATE "C" ORDER BY g.gloss COLLATE "C"), NULL) as glosses
+            FROM senses s
+            LEFT JOIN sense_pos sp ON s.id = sp.sense_id
+            LEFT JOIN sense_fields sf ON s.id = sf.sense_id
+            LEFT JOIN glosses g ON s.id = g.sense_id
+            WHERE s.entry_id = ANY(%s)
+            GROUP BY s.entry_id, s.id, s.sense_order
+            ORDER BY s.entry_id, s.sense_order
+        """, (list(entries),))
+        for row in cur.fetchall():
+            row = dict(row)
+            entries[row.pop('entry_id')]['senses'].append(row)
     
-    def search_by_meaning(self, text: str) -> Dict[str, Any]:
-        """Search for words by their English meaning."""
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Complete a kanji or kana prefix from an in-memory index built on first use."""
+        if self.autocomplete_index is None:
+            self.rebuild_autocomplete()
+        return self.autocomplete_index.complete(prefix, limit)
+    
+    def rebuild_autocomplete(self) -> int:
+        """Rebuild the autocomplete index (e.g. after an import) and return its size.
+        
+        The old index keeps serving until the new one is swapped in.
+        """
         with self._get_connection() as conn:
-            with conn.cursor() as cur:
+            index = AutocompleteIndex.from_database(conn)
+        self.autocomplete_index = index
+        return len(index)
+    
+    def search_by_meaning(self, text: str, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """Search for words by their English meaning.
+        
+        Entries are ranked by how well a gloss matches (whole gloss, then
+        whole word, then substring), then common entries and corpus
+        frequency first. The ILIKE filter is served by the trigram index
+        on glosses. Use limit/offset to page through the results.
+        """
+        with self._get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
-                    SELECT DISTINCT e.id, e.is_common,
-                           wf.form_text, wf.form_type, wf.is_common as form_common
-                    FROM entries e
-                    JOIN writing_forms wf ON e.id = wf.entry_id
-                    JOIN senses s ON e.id = s.entry_id
-                    JOIN glosses g ON s.id = g.sense_id
-                    WHERE g.gloss ILIKE %s
-                    ORDER BY e.is_common DESC, wf.form_text
-                """, (f'%{text}%',))
+                    WITH matches AS (
+                        SELECT s.entry_id,
+                               MIN(CASE
+                                   WHEN lower(g.gloss) = lower(%(text)s) THEN 0
+                                   WHEN g.gloss ~* %(word_pattern)s THEN 1
+                                   ELSE 2
+                               END) as match_rank
+                        FROM glosses g
+                        JOIN senses s ON s.id = g.sense_id
+                        WHERE g.gloss ILIKE %(like_pattern)s
+                        GROUP BY s.entry_id
+                    )
+                    SELECT e.id, e.is_common, m.match_rank
+                    FROM matches m
+                    JOIN entries e ON e.id = m.entry_id
+                    LEFT JOIN LATERAL (
+                        -- Probes the frequency_data primary key for matched entries only
+                        SELECT MIN(rank) as best_rank
+                        FROM frequency_data
+                        WHERE entry_id = e.id
+                    ) fd ON TRUE
+                    ORDER BY m.match_rank, e.is_common DESC, fd.best_rank NULLS LAST, e.id
+                    LIMIT %(limit)s OFFSET %(offset)s
+                """, {
+                    'text': text,
+                    'word_pattern': r'\m' + _escape_regex(text) + r'\M',
+                    'like_pattern': '%' + _escape_like(text) + '%',
+                    'limit': limit,
+                    'offset': offset
+                })
                 
                 results = {}
                 for row in cur.fetchall():
-                    entry_id = row['id']
-                    if entry_id not in results:
-                        results[entry_id] = {
-                            'id': entry_id,
-                            'is_common': row['is_common'],
-                            'writing_forms': [],
-                            'senses': []
-                        }
-                    
-                    results[entry_id]['writing_forms'].append({
+                    results[row['id']] = {
+                        'id': row['id'],
+                        'is_common': row['is_common'],
+                        'match_rank': row['match_rank'],
+                        'writing_forms': [],
+                        'senses': []
+                    }
+                if not results:
+                    return results
+                
+                # Get writing forms and senses for the page of entries
+                cur.execute("""
+                    SELECT entry_id, form_text, form_type, is_common
+                    FROM writing_forms
+                    WHERE entry_id = ANY(%s)
+                    ORDER BY entry_id, form_type, form_text
+                """, (list(results),))
+                for row in cur.fetchall():
+                    results[row['entry_id']]['writing_forms'].append({
                         'text': row['form_text'],
                         'type': row['form_type'],
-                        'is_common': row['form_common']
+                        'is_common': row['is_common']
                     })
                 
-                # Get detailed information for each entry
\ No newline at end of file
+                self._add_senses(cur, results)
+                return results
+
+def _escape_like(text: str) -> str:
+    """Escape LIKE wildcards so the text matches literally."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _escape_regex(text: str) -> str:
+    """Escape regex metacharacters for a Postgres regular expression."""
+    return re.sub(r'([^\w\s])', r'\\\1', text)
+
+class CachedJapaneseDictionary(JapaneseDictionary):
+    """JapaneseDictionary that serves repeated lookups from bounded in-process caches.
+
+    Results are shared between callers and must not be mutated. Imports
+    and frequency updates bump dictionary_version; the caches and the
+    autocomplete index are dropped when a lookup sees a new version,
+    checked at most every `version_check_interval` seconds. The TTL is a
+    backstop on top of that.
+    """
+
+    def __init__(self, pool: Optional[ConnectionPool] = None,
+                 maxsize: int = 10000, ttl: Optional[float] = 3600,
+                 version_check_interval: float = 5.0):
+        super().__init__(pool)
+        self.word_cache = LRUCache(maxsize, ttl)
+        self.meaning_cache = LRUCache(maxsize, ttl)
+        self.version_watcher = VersionWatcher(self._read_version, version_check_interval)
+
+    def _read_version(self) -> int:
+        with self._get_connection() as conn:
+            with conn.cursor() as cur:
+                return read_dictionary_version(cur)
+
+    def _check_version(self) -> None:
+        if self.version_watcher.changed():
+            self.invalidate()
+
+    def lookup_word(self, text: str) -> Dict[str, Any]:
+        return self.lookup_words([text])[text]
+
+    def lookup_words(self, texts: List[str]) -> Dict[str, Dict[str, Any]]:
+        self._check_version()
+        missing = object()
+        lookups = {}
+        misses = []
+        for text in dict.fromkeys(texts):
+            cached = self.word_cache.get(text, missing)
+            if cached is missing:
+                misses.append(text)
+            else:
+                lookups[text] = cached
+        if misses:
+            fetched = super().lookup_words(misses)
+            for text, results in fetched.items():
+                self.word_cache.put(text, results)
+            lookups.update(fetched)
+        return lookups
+
+    def search_by_meaning(self, text: str, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        self._check_version()
+        return self.meaning_cache.get_or_load(
+            (text, limit, offset),
+            lambda: super(CachedJapaneseDictionary, self).search_by_meaning(text, limit, offset)
+        )
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        self._check_version()
+        return super().autocomplete(prefix, limit)
+
+    def invalidate(self) -> None:
+        """Drop all cached lookups and the autocomplete index."""
+        self.word_cache.clear()
+        self.meaning_cache.clear()
+        self.autocomplete_index = None
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Return hit/miss/eviction counters for each cache."""
+        return {
+            'lookup_word': self.word_cache.stats(),
+            'search_by_meaning': self.meaning_cache.stats()
+        }
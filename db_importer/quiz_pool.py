@@ -0,0 +1,77 @@
+from japanese_conjugator import VERB_TYPES
+
+QUIZ_VERBS_DDL = """
+    CREATE TABLE IF NOT EXISTS quiz_verbs (
+        slot INTEGER PRIMARY KEY,
+        entry_id TEXT NOT NULL UNIQUE,
+        kanji TEXT,
+        kana TEXT NOT NULL,
+        verb_type TEXT NOT NULL,
+        te_kanji TEXT,
+        te_kana TEXT NOT NULL,
+        frequency_rank INTEGER,
+        weight DOUBLE PRECISION NOT NULL,
+        cumulative_weight DOUBLE PRECISION NOT NULL
+    )
+"""
+
+# Tables created before the weight columns existed; rebuilt right after, so defaults never stick
+QUIZ_VERBS_MIGRATIONS = (
+    "ALTER TABLE quiz_verbs ADD COLUMN IF NOT EXISTS weight DOUBLE PRECISION NOT NULL DEFAULT 0",
+    "ALTER TABLE quiz_verbs ADD COLUMN IF NOT EXISTS cumulative_weight DOUBLE PRECISION NOT NULL DEFAULT 0",
+    "CREATE INDEX IF NOT EXISTS idx_quiz_verbs_cumulative_weight ON quiz_verbs(cumulative_weight)",
+)
+
+# One row per common verb, numbered densely so random slots can be picked directly.
+# weight is the verb's highest corpus frequency (the smallest observed one when
+# it has none, as in QuizSampler); cumulative_weight is the running total in
+# slot order, so a uniform point in [0, total) picks a verb by weight.
+QUIZ_VERBS_INSERT = """
+    INSERT INTO quiz_verbs (slot, entry_id, kanji, kana, verb_type, te_kanji, te_kana,
+                            frequency_rank, weight, cumulative_weight)
+    SELECT slot, entry_id, kanji, kana, verb_type, te_kanji, te_kana, frequency_rank,
+           weight, SUM(weight) OVER (ORDER BY slot)
+    FROM (
+        SELECT ROW_NUMBER() OVER (ORDER BY fr.best_rank NULLS LAST, v.entry_id) as slot,
+               v.entry_id,
+               NULLIF(p.kanji, '') as kanji,
+               p.kana,
+               v.verb_type,
+               NULLIF(t.kanji, '') as te_kanji,
+               t.kana as te_kana,
+               fr.best_rank as frequency_rank,
+               COALESCE(fr.frequency, MIN(fr.frequency) OVER (), 1)::double precision as weight
+        FROM (
+            SELECT DISTINCT ON (c.entry_id) c.entry_id, c.conjugation_type as verb_type
+            FROM conjugations c
+            JOIN entries e ON e.id = c.entry_id
+            WHERE e.is_common = true
+            AND c.form = 'te_form'
+            AND c.conjugation_type = ANY(%s)
+            ORDER BY c.entry_id, c.conjugation_type
+        ) v
+        JOIN conjugations p ON p.entry_id = v.entry_id
+            AND p.conjugation_type = v.verb_type AND p.form = 'present'
+        JOIN conjugations t ON t.entry_id = v.entry_id
+            AND t.conjugation_type = v.verb_type AND t.form = 'te_form'
+        LEFT JOIN (
+            SELECT entry_id, MIN(rank) as best_rank, MAX(NULLIF(frequency, 0)) as frequency
+            FROM frequency_data
+            GROUP BY entry_id
+        ) fr ON fr.entry_id = v.entry_id
+    ) pool
+"""
+
+def refresh_quiz_pool(conn) -> int:
+    """Rebuild the quiz_verbs table in one transaction and return its row count."""
+    with conn.cursor() as cur:
+        cur.execute(QUIZ_VERBS_DDL)
+        for statement in QUIZ_VERBS_MIGRATIONS:
+            cur.execute(statement)
+        # DELETE rather than TRUNCATE so readers keep seeing the old pool until commit
+        cur.execute("DELETE FROM quiz_verbs")
+        cur.execute(QUIZ_VERBS_INSERT, (sorted(VERB_TYPES),))
+        count = cur.rowcount
+        cur.execute("ANALYZE quiz_verbs")
+    conn.commit()
+    return count
@@ -0,0 +1,122 @@
+import heapq
+import random
+from typing import Dict, List, Any, Optional, Sequence
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per weighted draw."""
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight")
+        scaled = [w * n / total for w in weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left is 1.0 up to rounding error
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def draw(self, rng: random.Random) -> int:
+        i = int(rng.random() * len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+class QuizSampler:
+    """Draw distinct quiz verbs weighted by corpus frequency, without touching the database.
+
+    `verbs` are dicts with at least 'verb_type', 'jlpt_level' and
+    'frequency' keys (see from_database). Verbs without frequency data get
+    the smallest observed weight so they can still come up. Alias tables
+    for each (verb_type, jlpt_level) filter are built on first use and
+    reused afterwards.
+    """
+
+    def __init__(self, verbs: List[Dict[str, Any]], rng: Optional[random.Random] = None):
+        self.verbs = verbs
+        self.rng = rng or random.Random()
+        positive = [float(v['frequency']) for v in verbs if v.get('frequency')]
+        floor = min(positive) if positive else 1.0
+        self.weights = [float(v['frequency']) if v.get('frequency') else floor for v in verbs]
+        self._pools: Dict[tuple, tuple] = {}
+
+    @classmethod
+    def from_database(cls, conn, source: Optional[str] = None,
+                      rng: Optional[random.Random] = None) -> 'QuizSampler':
+        """Load the quiz pool with frequencies (from one source, or the highest across sources)."""
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT q.entry_id, q.kanji, q.kana, q.verb_type, q.te_kanji, q.te_kana,
+                       j.level as jlpt_level, f.frequency
+                FROM quiz_verbs q
+                LEFT JOIN jlpt_levels j ON j.entry_id = q.entry_id
+                LEFT JOIN (
+                    SELECT entry_id, MAX(frequency) as frequency
+                    FROM frequency_data
+                    WHERE %(source)s IS NULL OR source = %(source)s
+                    GROUP BY entry_id
+                ) f ON f.entry_id = q.entry_id
+                ORDER BY q.slot
+            """, {'source': source})
+            columns = [col[0] for col in cur.description]
+            return cls([dict(zip(columns, row)) for row in cur.fetchall()], rng)
+
+    def _pool(self, verb_type: Optional[str], jlpt_level: Optional[int]) -> tuple:
+        key = (verb_type, jlpt_level)
+        pool = self._pools.get(key)
+        if pool is None:
+            indices = [i for i, v in enumerate(self.verbs)
+                       if (verb_type is None or v['verb_type'] == verb_type)
+                       and (jlpt_level is None or v['jlpt_level'] == jlpt_level)]
+            weights = [self.weights[i] for i in indices]
+            pool = (indices, weights, sum(weights), AliasTable(weights) if indices else None)
+            self._pools[key] = pool
+        return pool
+
+    def _without_replacement(self, k: int, candidates: List[int], weights: List[float]) -> List[int]:
+        """Weighted sampling without replacement (Efraimidis-Spirakis), in draw order."""
+        rng = self.rng
+        return heapq.nlargest(k, candidates, key=lambda i: rng.random() ** (1.0 / weights[i]))
+
+    def sample(self, n: int, verb_type: Optional[str] = None,
+               jlpt_level: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Draw up to n distinct verbs, more frequent verbs being more likely."""
+        indices, weights, total, table = self._pool(verb_type, jlpt_level)
+        if n >= len(indices):
+            chosen = list(range(len(indices)))
+            self.rng.shuffle(chosen)
+        elif n * 2 <= len(indices):
+            # Draw with the alias table and reject repeats. Once half the weight
+            # mass has been drawn (or repeats pile up, e.g. a few verbs dominate)
+            # most draws would be rejected, so finish without replacement.
+            seen = set()
+            chosen = []
+            drawn = 0.0
+            rejected = 0
+            while len(chosen) < n:
+                if drawn * 2 > total or rejected > n:
+                    remaining = [i for i in range(len(indices)) if i not in seen]
+                    chosen += self._without_replacement(n - len(chosen), remaining, weights)
+                    break
+                i = table.draw(self.rng)
+                if i in seen:
+                    rejected += 1
+                else:
+                    seen.add(i)
+                    chosen.append(i)
+                    drawn += weights[i]
+        else:
+            # Dense draws: weighted sampling without replacement throughout
+            chosen = self._without_replacement(n, list(range(len(indices))), weights)
+        return [self.verbs[indices[i]] for i in chosen]
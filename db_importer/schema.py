@@ -0,0 +1,28 @@
+# Extensions the indexes below depend on
+EXTENSIONS = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+)
+
+# Secondary indexes on the dictionary tables (mirrors db/init.sql)
+INDEX_DEFINITIONS = {
+    'idx_writing_forms_text': "CREATE INDEX IF NOT EXISTS idx_writing_forms_text ON writing_forms(form_text)",
+    'idx_senses_entry_id': "CREATE INDEX IF NOT EXISTS idx_senses_entry_id ON senses(entry_id)",
+    'idx_glosses_sense_id': "CREATE INDEX IF NOT EXISTS idx_glosses_sense_id ON glosses(sense_id)",
+    'idx_examples_entry_id': "CREATE INDEX IF NOT EXISTS idx_examples_entry_id ON examples(entry_id)",
+    'idx_conjugations_entry_id': "CREATE INDEX IF NOT EXISTS idx_conjugations_entry_id ON conjugations(entry_id)",
+    'idx_word_relationships_entry_id': "CREATE INDEX IF NOT EXISTS idx_word_relationships_entry_id ON word_relationships(entry_id)",
+    'frequency_rank_idx': "CREATE INDEX IF NOT EXISTS frequency_rank_idx ON frequency_data(frequency)",
+    'idx_glosses_gloss_trgm': "CREATE INDEX IF NOT EXISTS idx_glosses_gloss_trgm ON glosses USING gin (gloss gin_trgm_ops)",
+}
+
+# Tables populated by the JMdict import
+DICTIONARY_TABLES = (
+    'entries',
+    'writing_forms',
+    'senses',
+    'sense_pos',
+    'sense_fields',
+    'glosses',
+    'examples',
+    'conjugations',
+)
@@ -0,0 +1,37 @@
+import unittest
+from autocomplete import AutocompleteIndex
+
+class TestAutocompleteIndex(unittest.TestCase):
+    def setUp(self):
+        self.rows = [
+            ('食べる', '1', True, 50),
+            ('たべる', '1', True, 50),
+            ('食べ物', '2', True, 20),
+            ('たべもの', '2', True, 20),
+            ('食う', '3', False, 10),
+            ('たい', '4', True, None),
+            ('たい', '5', False, 5),
+            ('鯛', '5', False, 5),
+        ]
+        self.index = AutocompleteIndex(self.rows, precompute_length=1, precompute_k=3)
+
+    def test_ranks_common_then_frequency(self):
+        texts = [c['text'] for c in self.index.complete('食', 10)]
+        self.assertEqual(texts, ['食べ物', '食べる', '食う'])
+
+    def test_precomputed_and_scanned_prefixes_agree(self):
+        scanned = AutocompleteIndex(self.rows, precompute_length=0)
+        self.assertEqual(self.index.complete('た', 3), scanned.complete('た', 3))
+        self.assertEqual([c['text'] for c in self.index.complete('た', 3)], ['たべもの', 'たべる', 'たい'])
+        self.assertEqual([c['text'] for c in self.index.complete('たべ', 5)], ['たべもの', 'たべる'])
+
+    def test_duplicate_forms_keep_best_entry(self):
+        self.assertEqual(len(self.index), 7)
+        self.assertEqual(self.index.complete('たい', 1)[0]['entry_id'], '4')
+
+    def test_no_matches(self):
+        self.assertEqual(self.index.complete('ん'), [])
+        self.assertEqual(self.index.complete(''), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from benchmark import compare, measure, percentile
+
+class TestBenchmark(unittest.TestCase):
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 90), 7)
+
+    def test_measure_reports_percentiles(self):
+        stats = measure(lambda x: x * 2, range(50), warmup=5)
+        self.assertEqual(stats['count'], 50)
+        self.assertLessEqual(stats['min'], stats['p50'])
+        self.assertLessEqual(stats['p50'], stats['p99'])
+        self.assertLessEqual(stats['p99'], stats['max'])
+
+    def test_compare_flags_regressions(self):
+        baseline = {'suites': {'conjugator': {'conjugate_verb': {'p50': 10.0}}}}
+        results = {'suites': {'conjugator': {'conjugate_verb': {'p50': 13.0},
+                                             'new_benchmark': {'p50': 1.0}}}}
+        self.assertEqual(len(compare(results, baseline, 1.2)), 1)
+        self.assertEqual(compare(results, baseline, 1.5), [])
+
+if __name__ == '__main__':
+    unittest.main()
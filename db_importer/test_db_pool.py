@@ -0,0 +1,93 @@
+import threading
+import time
+import unittest
+from unittest import mock
+import psycopg2
+import psycopg2.extensions
+from fake_clock import FakeClock
+import db_pool
+from db_pool import ConnectionPool, PoolTimeout, get_pool
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed = 1
+
+    def cursor(self):
+        return mock.MagicMock()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def get_transaction_status(self):
+        return psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch('db_pool.psycopg2.connect', side_effect=lambda **kwargs: FakeConnection())
+        self.connect = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_timeout_when_full(self):
+        pool = ConnectionPool({}, minconn=0, maxconn=1)
+        pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(timeout=0.05)
+        self.assertEqual(pool.metrics()['waiting'], 0)
+
+    def test_putconn_wakes_waiter(self):
+        pool = ConnectionPool({}, minconn=0, maxconn=1)
+        conn = pool.getconn()
+        received = []
+        waiter = threading.Thread(target=lambda: received.append(pool.getconn(timeout=5)))
+        waiter.start()
+        while pool.metrics()['waiting'] == 0:
+            time.sleep(0.001)
+        pool.putconn(conn)
+        waiter.join(5)
+        self.assertEqual(received, [conn])
+        self.assertEqual(pool.metrics()['connections_created'], 1)
+
+    def test_failed_connect_releases_slot(self):
+        pool = ConnectionPool({}, minconn=0, maxconn=1)
+        self.connect.side_effect = psycopg2.OperationalError("refused")
+        with self.assertRaises(psycopg2.OperationalError):
+            pool.getconn(timeout=0)
+        self.connect.side_effect = lambda **kwargs: FakeConnection()
+        pool.getconn(timeout=0)
+        metrics = pool.metrics()
+        self.assertEqual((metrics['size'], metrics['in_use']), (1, 1))
+
+    def test_prunes_idle_connections_to_minconn(self):
+        clock = FakeClock()
+        with mock.patch('db_pool.time.monotonic', clock):
+            pool = ConnectionPool({}, minconn=1, maxconn=3, idle_timeout=10)
+            conns = [pool.getconn() for _ in range(3)]
+            for conn in conns:
+                pool.putconn(conn)
+            clock.now += 11
+            pool.getconn()
+        metrics = pool.metrics()
+        self.assertEqual((metrics['size'], metrics['idle'], metrics['in_use']), (1, 0, 1))
+        self.assertEqual(metrics['connections_closed'], 2)
+        self.assertEqual(sum(1 for conn in conns if conn.closed), 2)
+
+    def test_new_pool_after_fork(self):
+        params = {'dbname': 'test-pool-fork'}
+        key = tuple(sorted(params.items()))
+        self.addCleanup(db_pool._pools.pop, key, None)
+        with mock.patch('db_pool.os.getpid', return_value=1):
+            first = get_pool(params)
+            self.assertIs(get_pool(params), first)
+        with mock.patch('db_pool.os.getpid', return_value=2):
+            second = get_pool(params)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.pid, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from deconjugator import DeconjugationIndex
+
+class TestDeconjugationIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = DeconjugationIndex.from_entries([
+            {
+                'id': '1',
+                'kanji': [{'text': '書く'}],
+                'kana': [{'text': 'かく'}],
+                'sense': [{'partOfSpeech': ['v5k']}]
+            },
+            {
+                'id': '2',
+                'kanji': [{'text': '食べる'}],
+                'kana': [{'text': 'たべる'}],
+                'sense': [{'partOfSpeech': ['v1']}]
+            },
+            {
+                'id': '3',
+                'kanji': [{'text': '帰る'}],
+                'kana': [{'text': 'かえる'}],
+                'sense': [{'partOfSpeech': ['v5r']}]
+            },
+            {
+                'id': '4',
+                'kanji': [{'text': '変える'}],
+                'kana': [{'text': 'かえる'}],
+                'sense': [{'partOfSpeech': ['v1']}]
+            }
+        ])
+
+    def test_kanji_and_kana_forms(self):
+        self.assertEqual(self.index.lookup('書いて'), [('1', 'v5k', 'te_form')])
+        self.assertEqual(self.index.lookup('かいて'), [('1', 'v5k', 'te_form')])
+
+    def test_shared_surface_forms(self):
+        self.assertEqual(self.index.lookup('食べられる'),
+                         [('2', 'v1', 'potential'), ('2', 'v1', 'passive')])
+        # かえる is the dictionary form of two different words
+        self.assertEqual({match[0] for match in self.index.lookup('かえる')}, {'3', '4'})
+
+    def test_unknown_form(self):
+        self.assertEqual(self.index.lookup('たべたい'), [])
+        self.assertNotIn('たべたい', self.index)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import tempfile
+import unittest
+from contextlib import contextmanager
+from dictionary_snapshot import DictionarySnapshot, SnapshotWriter, export_snapshot
+from query_db import JapaneseDictionary
+
+ENTRIES = [
+    {
+        'id': '1',
+        'is_common': True,
+        'writing_forms': [
+            {'text': '帰る', 'type': 'kanji', 'is_common': True},
+            {'text': 'かえる', 'type': 'kana', 'is_common': True}
+        ],
+        'senses': [{'id': 10, 'sense_order': 1, 'pos': ['v5r'], 'fields': [], 'glosses': ['to return']}],
+        'conjugations': [
+            {'conjugation_type': 'v5r', 'form': 'te_form', 'kanji': '帰って', 'kana': 'かえって'}
+        ],
+        'examples': [{'japanese': '家に帰る。', 'english': 'I go home.'}]
+    },
+    {
+        'id': '2',
+        'is_common': False,
+        'writing_forms': [{'text': 'かえる', 'type': 'kana', 'is_common': False}],
+        'senses': [{'id': 11, 'sense_order': 1, 'pos': ['n'], 'fields': ['zool'], 'glosses': ['frog']}],
+        'conjugations': [{'conjugation_type': 'x', 'form': 'y', 'kanji': None, 'kana': 'z'}],
+        'examples': []
+    },
+]
+
+class TestDictionarySnapshot(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.snapshot')
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        writer = SnapshotWriter()
+        for entry in ENTRIES:
+            writer.add_entry(entry)
+        writer.write(self.path)
+        self.snapshot = DictionarySnapshot(self.path)
+        self.addCleanup(self.snapshot.close)
+
+    def test_lookup_round_trips_entries(self):
+        self.assertEqual(len(self.snapshot), 2)
+        self.assertEqual(self.snapshot.lookup_word('帰る'), {'1': ENTRIES[0]})
+        self.assertEqual(self.snapshot.lookup_word('かえる'), {'1': ENTRIES[0], '2': ENTRIES[1]})
+
+    def test_missing_word(self):
+        self.assertEqual(self.snapshot.lookup_word('ない'), {})
+        self.assertEqual(self.snapshot.lookup_words(['ない', '帰る'])['ない'], {})
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a snapshot' * 10)
+        with self.assertRaises(ValueError):
+            DictionarySnapshot(self.path)
+
+# Rows of the dictionary tables behind FakeConnection
+TABLES = {
+    'entries': [('1', True), ('2', False), ('3', False)],
+    'writing_forms': [('1', 'かえる', 'kana', True), ('1', '帰る', 'kanji', True),
+                      ('2', 'かえる', 'kana', False), ('3', 'ない', 'kana', False)],
+    'senses': [(10, '1', 1), (11, '1', 2), (12, '2', 1), (13, '3', 1)],
+    'sense_pos': [(10, 'v5r'), (10, 'vi'), (12, 'n')],
+    'sense_fields': [(12, 'zool')],
+    'glosses': [(10, 'to return'), (10, 'to go home'), (11, 'to return'), (12, 'frog'), (12, 'Frog')],
+    'conjugations': [('1', 'v5r', 'te_form', '帰って', 'かえって'), ('1', 'v5r', 'present', '帰る', 'かえる')],
+    'examples': [(2, '1', '家に帰る。', 'I go home.'), (1, '1', '帰ります。', "I'm going home.")],
+}
+
+class FakeCursor:
+    """Answer the lookup and export queries from TABLES, following their ORDER BY clauses."""
+
+    def __init__(self, as_dicts: bool):
+        self.as_dicts = as_dicts
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def fetchall(self):
+        return self.rows
+
+    def _lists(self, sense_id):
+        return tuple(sorted({value for sid, value in TABLES[table] if sid == sense_id})
+                     for table in ('sense_pos', 'sense_fields', 'glosses'))
+
+    def execute(self, query, params=None):
+        ids = set(params[0]) if params else None
+        wanted = lambda entry_id: ids is None or entry_id in ids
+        if 'w2.form_text' in query:
+            matches = {(text, entry_id) for entry_id, text, _, _ in TABLES['writing_forms'] if text in ids}
+            common = dict(TABLES['entries'])
+            rows = sorted({(text, entry_id, common[entry_id], form, form_type, form_common)
+                           for text, entry_id in matches
+                           for eid, form, form_type, form_common in TABLES['writing_forms'] if eid == entry_id},
+                          key=lambda r: (r[1], [-ord(c) for c in r[4]], r[3]))
+            keys = ('query', 'id', 'is_common', 'form_text', 'form_type', 'form_common')
+        elif 'FROM entries' in query:
+            rows, keys = sorted(TABLES['entries']), None
+        elif 'FROM writing_forms' in query:
+            rows = sorted(TABLES['writing_forms'], key=lambda r: (r[0], [-ord(c) for c in r[2]], r[1]))
+            keys = None
+        elif 'FROM senses' in query:
+            rows = sorted((entry_id, sense_id, order, *map(list, self._lists(sense_id)))
+                          for sense_id, entry_id, order in TABLES['senses'] if wanted(entry_id))
+            rows.sort(key=lambda r: (r[0], r[2]))
+            keys = ('entry_id', 'id', 'sense_order', 'pos', 'fields', 'glosses')
+        elif 'FROM conjugations' in query:
+            rows = sorted(r for r in TABLES['conjugations'] if wanted(r[0]))
+            keys = ('entry_id', 'conjugation_type', 'form', 'kanji', 'kana')
+        elif 'FROM examples' in query:
+            rows = [r[1:] for r in sorted(TABLES['examples'], key=lambda r: (r[1], r[0])) if wanted(r[1])]
+            keys = ('entry_id', 'japanese', 'english')
+        else:
+            raise AssertionError(f"unexpected query: {query}")
+        self.rows = [dict(zip(keys, row)) for row in rows] if self.as_dicts and keys else rows
+
+class FakeConnection:
+    def cursor(self, name=None, cursor_factory=None):
+        return FakeCursor(as_dicts=cursor_factory is not None)
+
+class FakePool:
+    @contextmanager
+    def connection(self):
+        yield FakeConnection()
+
+class TestExportSnapshot(unittest.TestCase):
+    def test_snapshot_matches_database_lookup(self):
+        fd, path = tempfile.mkstemp(suffix='.snapshot')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        self.assertEqual(export_snapshot(FakeConnection(), path), 3)
+
+        words = ['かえる', '帰る', 'ない', 'なし']
+        expected = JapaneseDictionary(FakePool()).lookup_words(words)
+        self.assertEqual(expected['ない']['3']['senses'][0]['glosses'], [])
+        with DictionarySnapshot(path) as snapshot:
+            self.assertEqual(snapshot.lookup_words(words), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from unittest import mock
+from bulk_loader import BulkLoader, bulk_import, copy_line
+from entry_fingerprints import entry_fingerprint
+
+class TestEntryFingerprint(unittest.TestCase):
+    def test_ignores_key_order(self):
+        a = {'id': '1', 'kanji': [{'text': '食べる', 'common': True}], 'kana': []}
+        b = {'kana': [], 'kanji': [{'common': True, 'text': '食べる'}], 'id': '1'}
+        self.assertEqual(entry_fingerprint(a), entry_fingerprint(b))
+
+    def test_detects_changes(self):
+        a = {'id': '1', 'sense': [{'gloss': [{'text': 'to eat'}]}]}
+        b = {'id': '1', 'sense': [{'gloss': [{'text': 'to eat'}, {'text': 'to live on'}]}]}
+        self.assertNotEqual(entry_fingerprint(a), entry_fingerprint(b))
+
+    def test_bulk_loader_records_fingerprints(self):
+        entry = {'id': '1', 'kanji': [], 'kana': [{'text': 'たべる', 'common': True}],
+                 'sense': [{'partOfSpeech': ['n'], 'gloss': [{'text': 'food'}]}]}
+        loader = BulkLoader(mock.MagicMock(), first_sense_id=1)
+        loader.add_entry(entry)
+        self.assertEqual(loader.buffers['entry_fingerprints'], [copy_line(('1', entry_fingerprint(entry)))])
+
+    def test_bulk_import_replaces_stale_fingerprints(self):
+        conn = mock.MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        cur.fetchone.return_value = (1,)
+        with mock.patch('bulk_loader.iter_entries', return_value=[{'id': '1', 'kana': [{'text': 'か'}]}]):
+            bulk_import(conn, 'jmdict.json')
+        statements = [c.args[0] for c in cur.method_calls if c[0] in ('execute', 'copy_expert')]
+        truncate = statements.index("TRUNCATE entry_fingerprints")
+        copy = next(i for i, sql in enumerate(statements) if sql.startswith("COPY entry_fingerprints"))
+        self.assertLess(truncate, copy)
+
+if __name__ == '__main__':
+    unittest.main()
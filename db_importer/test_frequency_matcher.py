@@ -0,0 +1,31 @@
+import unittest
+from frequency_matcher import FormIndex, matcher_key
+
+class TestFormIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = FormIndex()
+        self.index.add_rows([
+            ('1', '食べる'), ('1', 'たべる'), ('1', 'たべる'),
+            ('2', '帰る'), ('2', 'かえる'),
+            ('3', '変える'), ('3', 'かえる'),
+        ])
+
+    def test_lookup(self):
+        self.assertEqual(self.index.lookup('たべる'), ['1'])
+        self.assertEqual(self.index.lookup('かえる'), ['2', '3'])
+        self.assertEqual(self.index.lookup('ない'), [])
+
+    def test_aggregate_sums_all_forms(self):
+        totals = self.index.aggregate({'食べる': 10, 'たべる': 5, 'ない': 100})
+        self.assertEqual(totals, {'1': 15})
+
+    def test_aggregate_splits_shared_forms(self):
+        totals = self.index.aggregate({'かえる': 30, '帰る': 100, '変える': 20})
+        self.assertEqual(totals, {'2': 115, '3': 35})
+        self.assertEqual(sum(totals.values()), 150)
+
+    def test_matcher_key_tracks_mode(self):
+        self.assertNotEqual(matcher_key(False), matcher_key(True))
+
+if __name__ == '__main__':
+    unittest.main()
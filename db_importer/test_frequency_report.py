@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from frequency_report import FrequencyRecord, FrequencyReport, parse_record
+
+class TestFrequencyReport(unittest.TestCase):
+    def write_report(self, content: bytes) -> str:
+        fd, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_parse_kanji_record(self):
+        record = parse_record('1070004\t日\t1\t1\t1.53819862\t1.53819862\r\n'.encode('utf-8'))
+        self.assertEqual(record, FrequencyRecord(1070004, '日', 1, 1, 1.53819862, 1.53819862))
+
+    def test_parse_word_record(self):
+        record = parse_record('120\t食べる'.encode('utf-8'))
+        self.assertEqual(record.token, '食べる')
+        self.assertIsNone(record.rank)
+        self.assertIsNone(parse_record(b'abc\tx'))
+        self.assertIsNone(parse_record(b''))
+
+    def test_streams_with_bom_and_cutoffs(self):
+        path = self.write_report('﻿50\t日\t1\t1\t50.0\t50.0\n30\t一\t2\t2\t30.0\t80.0\n'
+                                 '20\t国\t3\t3\t20.0\t100.0'.encode('utf-8'))
+        report = FrequencyReport(path)
+        self.assertEqual([r.token for r in report], ['日', '一', '国'])
+        self.assertEqual([r.token for r in report.records(top_n=2)], ['日', '一'])
+        self.assertEqual([r.token for r in report.records(coverage=60)], ['日', '一'])
+
+    def test_coverage_without_cumulative_column(self):
+        path = self.write_report('60\tする\n30\tある\n10\tいる\n'.encode('utf-8'))
+        tokens = [r.token for r in FrequencyReport(path).records(coverage=90)]
+        self.assertEqual(tokens, ['する', 'ある'])
+
+    def test_empty_file(self):
+        self.assertEqual(list(FrequencyReport(self.write_report(b''))), [])
+
+if __name__ == '__main__':
+    unittest.main()
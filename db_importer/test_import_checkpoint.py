@@ -0,0 +1,129 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from fake_clock import FakeClock
+from import_checkpoint import ImportCheckpoint, ImportProgress, checkpoint_key
+from import_data import import_entries
+
+def write_jmdict(directory: str, ids) -> str:
+    path = os.path.join(directory, 'jmdict.json')
+    words = [{'id': entry_id, 'kanji': [], 'kana': [{'text': 'かな'}], 'sense': []} for entry_id in ids]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': '3.6.1', 'words': words}, f, ensure_ascii=False)
+    return path
+
+class TestCheckpointKey(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_same_name_in_other_directory(self):
+        first = write_jmdict(self.tmp.name, ['1'])
+        os.mkdir(os.path.join(self.tmp.name, 'other'))
+        second = write_jmdict(os.path.join(self.tmp.name, 'other'), ['1'])
+        self.assertNotEqual(checkpoint_key(first)[0], checkpoint_key(second)[0])
+
+    def test_key_changes_with_mtime(self):
+        path = write_jmdict(self.tmp.name, ['1'])
+        key, prefix = checkpoint_key(path)
+        self.assertTrue(key.startswith(prefix))
+        os.utime(path, ns=(0, 10 ** 9))
+        self.assertNotEqual(checkpoint_key(path)[0], key)
+        self.assertEqual(checkpoint_key(path)[1], prefix)
+
+    def test_load_refuses_other_version_of_file(self):
+        path = write_jmdict(self.tmp.name, ['1'])
+        conn = mock.MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        cur.fetchone.side_effect = [None, (1,)]
+        with self.assertRaises(ValueError):
+            ImportCheckpoint(conn, path).load()
+        cur.fetchone.side_effect = [None, None]
+        self.assertEqual(ImportCheckpoint(conn, path).load(), (0, None, False))
+
+class TestImportProgress(unittest.TestCase):
+    def test_report_rates_and_eta_from_this_run(self):
+        clock = FakeClock(100.0)
+        with mock.patch('import_checkpoint.time.monotonic', clock):
+            progress = ImportProgress(total_bytes=1000, start_bytes=100)
+            for _ in range(20):
+                progress.add({'entries': 1, 'senses': 2})
+            clock.now += 10
+            report = progress.report(600, done_before=50)
+        # 500 bytes in 10s leaves 400 bytes, 8s
+        self.assertEqual(report, "Entry 70: 2 entries/s, 60% of file, ETA 8s\n"
+                                 "  rows: entries 2/s, senses 4/s")
+
+    def test_report_without_progress_through_file(self):
+        clock = FakeClock(100.0)
+        with mock.patch('import_checkpoint.time.monotonic', clock):
+            progress = ImportProgress(total_bytes=1000, start_bytes=100)
+            clock.now += 1
+            self.assertEqual(progress.report(100), "Entry 0: 0 entries/s")
+
+class TestImportEntriesResume(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = write_jmdict(self.tmp.name, ['1', '2', '3', '4', '5'])
+        self.conn = mock.MagicMock()
+        self.processed = []
+        # Sense rows per entry, standing in for the table without a conflict key
+        self.senses = {}
+        def process_entry(entry, cur):
+            self.processed.append(entry['id'])
+            self.senses[entry['id']] = self.senses.get(entry['id'], 0) + 1
+            return {'entries': 1}
+        def delete_entry_rows(cur, entry_ids):
+            for entry_id in entry_ids:
+                self.senses.pop(entry_id, None)
+        for name, fake in (('process_entry', process_entry), ('delete_entry_rows', delete_entry_rows)):
+            patcher = mock.patch(f'import_data.{name}', side_effect=fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch('import_data.execute_values')
+        self.execute_values = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('import_data.ImportCheckpoint')
+        self.checkpoint = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def test_resumes_after_committed_entries(self):
+        self.checkpoint.load.return_value = (2, '2', False)
+        counts = import_entries(self.conn, self.path, batch_size=2)
+        self.assertEqual(self.processed, ['3', '4', '5'])
+        self.assertEqual(counts, {'entries': 3})
+        saves = [c.args[1:] + tuple(c.kwargs.values()) for c in self.checkpoint.save.call_args_list]
+        self.assertEqual(saves, [(4, '4'), (5, '5', True)])
+        fingerprinted = [entry_id for c in self.execute_values.call_args_list for entry_id, _ in c.args[2]]
+        self.assertEqual(fingerprinted, ['3', '4', '5'])
+        self.assertEqual(self.senses, {'3': 1, '4': 1, '5': 1})
+
+    def test_mismatched_checkpoint(self):
+        self.checkpoint.load.return_value = (2, '3', False)
+        with self.assertRaises(ValueError):
+            import_entries(self.conn, self.path)
+        self.assertEqual(self.processed, [])
+
+    def test_completed_import_is_skipped(self):
+        self.checkpoint.load.return_value = (5, '5', True)
+        self.assertEqual(import_entries(self.conn, self.path), {})
+        self.assertEqual(self.processed, [])
+
+    def test_restart_clears_checkpoint(self):
+        self.checkpoint.load.return_value = (0, None, False)
+        import_entries(self.conn, self.path, restart=True)
+        self.checkpoint.clear.assert_called_once()
+        self.assertEqual(self.processed, ['1', '2', '3', '4', '5'])
+
+    def test_restart_over_committed_rows_does_not_duplicate(self):
+        # An earlier run committed the first three entries before failing
+        self.senses = {'1': 1, '2': 1, '3': 1}
+        self.checkpoint.load.return_value = (0, None, False)
+        import_entries(self.conn, self.path, batch_size=2, restart=True)
+        self.assertEqual(self.senses, {'1': 1, '2': 1, '3': 1, '4': 1, '5': 1})
+
+if __name__ == '__main__':
+    unittest.main()
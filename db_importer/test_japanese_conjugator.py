@@ -1,5 +1,5 @@
 import unittest
-from japanese_conjugator import JapaneseConjugator, process_dictionary_entry
+from japanese_conjugator import JapaneseConjugator, process_dictionary_entry, get_conjugator, conjugate_many, VERB_FORMS
 
 class TestJapaneseConjugator(unittest.TestCase):
     def setUp(self):
@@ -219,5 +219,54 @@ class TestJapaneseConjugator(unittest.TestCase):
         }
         self.verify_all_conjugations(kirei_test, expected)
 
+    def test_verb_forms_without_kanji(self):
+        # Kana-only words get empty kanji forms
+        forms, kanji, kana = self.conjugator.verb_forms('', 'たべる', 'v1')
+        self.assertEqual(forms, VERB_FORMS)
+        self.assertEqual(kanji, ('',) * len(VERB_FORMS))
+        self.assertEqual(kana[forms.index('te_form')], 'たべて')
+
+    def test_unsupported_types(self):
+        self.assertIsNone(self.conjugator.verb_forms('する', 'する', 'vs-i'))
+        self.assertEqual(self.conjugator.conjugate_verb('連れて来る', 'つれてくる', 'vk'), {})
+        self.assertEqual(self.conjugator.conjugate_adjective('大きい', 'おおきい', 'v1'), {})
+
+    def test_conjugate_many_matches_single_word(self):
+        words = [
+            ('書く', 'かく', 'v5k'),
+            ('', 'たべる', 'v1'),
+            ('飲む', 'のむ', 'v5m'),
+            ('大きい', 'おおきい', 'adj-i'),
+            ('来る', 'くる', 'vk'),
+            ('食べる', 'たべる', 'v1'),
+            ('', 'する', 'vs-i')
+        ]
+        results = conjugate_many(words)
+        self.assertNotIn('vs-i', results)
+        self.assertEqual(results['v1']['indices'], [1, 5])
+        for word_type, group in results.items():
+            for position, index in enumerate(group['indices']):
+                word_kanji, word_kana, _ = words[index]
+                if word_type.startswith('adj'):
+                    expected = self.conjugator.conjugate_adjective(word_kanji, word_kana, word_type)
+                else:
+                    expected = self.conjugator.conjugate_verb(word_kanji, word_kana, word_type)
+                for form in group['forms']:
+                    self.assertEqual(group['kanji'][form][position], expected[form]['kanji'])
+                    self.assertEqual(group['kana'][form][position], expected[form]['kana'])
+
+    def test_compact_results(self):
+        kaku_test = {
+            'kanji': [{'text': '書く'}],
+            'kana': [{'text': 'かく'}],
+            'sense': [{'partOfSpeech': ['v5k']}, {'partOfSpeech': ['adj-na']}]
+        }
+        compact = process_dictionary_entry(kaku_test, compact=True)
+        self.assertEqual([result.to_dict() for result in compact], process_dictionary_entry(kaku_test))
+        self.assertEqual(compact[0]['te_form'], ('書いて', 'かいて'))
+
+    def test_shared_conjugator(self):
+        self.assertIs(get_conjugator(), get_conjugator())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+import unittest
+from jmdict_reader import JMdictReader
+
+class TestJMdictReader(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            'version': '3.6.1',
+            'languages': ['eng'],
+            'tags': {'v5u': "Godan verb with 'u' ending"},
+            'words': [
+                {'id': '1', 'kanji': [{'text': '買う'}], 'kana': [{'text': 'かう'}]},
+                {'id': '2', 'kanji': [], 'kana': [{'text': 'きれい'}]},
+                {'id': '3', 'kanji': [{'text': '食べる'}], 'kana': [{'text': 'たべる'}]}
+            ]
+        }
+        fd, self.filename = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8-sig') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_yields_all_entries(self):
+        entries = list(JMdictReader(self.filename))
+        self.assertEqual(entries, self.data['words'])
+
+    def test_small_chunks_split_multibyte_text(self):
+        # Chunks smaller than a single character must still decode correctly
+        for chunk_size in (1, 2, 5):
+            entries = list(JMdictReader(self.filename, chunk_size=chunk_size))
+            self.assertEqual(entries, self.data['words'], f"chunk_size={chunk_size}")
+
+    def test_reads_metadata(self):
+        reader = JMdictReader(self.filename)
+        list(reader)
+        self.assertEqual(reader.metadata['version'], '3.6.1')
+        self.assertEqual(reader.metadata['tags'], self.data['tags'])
+
+    def test_tracks_bytes_read(self):
+        reader = JMdictReader(self.filename, chunk_size=16)
+        seen = [reader.bytes_read for _ in reader]
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual(reader.bytes_read, os.path.getsize(self.filename))
+
+if __name__ == '__main__':
+    unittest.main()
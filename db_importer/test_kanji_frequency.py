@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from kanji_frequency import KanjiIndex, is_kanji
+
+# 日 and 本 tie for rank 1; 人 has the next competition rank, 3
+REPORT = ('﻿100\t日\t1\t1\t40.0\t40.0\n'
+          '100\t本\t1\t1\t40.0\t80.0\n'
+          '40\t人\t2\t3\t16.0\t96.0\n'
+          '10\t語\t3\t4\t4.0\t100.0\n')
+
+class TestKanjiIndex(unittest.TestCase):
+    def setUp(self):
+        fd, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(REPORT.encode('utf-8'))
+        self.addCleanup(os.remove, path)
+        self.index = KanjiIndex.from_report(path)
+
+    def test_tied_ranks_from_report(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual([self.index.rank(c) for c in '日本人語'], [1, 1, 3, 4])
+        self.assertEqual(self.index.get('人').dense_rank, 2)
+        self.assertEqual(self.index.get('本').coverage, 80.0)
+
+    def test_unknown_kanji_rank(self):
+        self.assertEqual(self.index.unknown_rank, 5)
+        self.assertEqual(self.index.rank('猫'), 5)
+
+    def test_difficulty_over_distinct_kanji(self):
+        # 日本 and 日本人 share 日 and 本, which count once each
+        self.assertEqual(self.index.difficulty(['日本', '日本人']), (3, 5 / 3, 3))
+        self.assertEqual(self.index.difficulty(['日本語の猫']), (5, 11 / 4, 4))
+
+    def test_difficulty_of_kana_only_forms(self):
+        self.assertIsNone(self.index.difficulty(['にほん', 'ニホン']))
+        self.assertIsNone(self.index.difficulty([]))
+
+    def test_is_kanji(self):
+        self.assertTrue(all(is_kanji(c) for c in '日々㐀'))
+        self.assertFalse(any(is_kanji(c) for c in 'にニa1'))
+
+if __name__ == '__main__':
+    unittest.main()
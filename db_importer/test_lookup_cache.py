@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+from fake_clock import FakeClock
+from lookup_cache import LRUCache, VersionWatcher, invalidate_all
+
+class TestLRUCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('lookup_cache.time.monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)  # 'b' is now the oldest
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(ttl=10)
+        cache.put('a', 1)
+        self.clock.now += 9.5
+        self.assertEqual(cache.get('a'), 1)
+        self.clock.now += 1
+        self.assertEqual(cache.get('a', 'gone'), 'gone')
+        self.assertEqual(len(cache), 0)
+
+    def test_counters(self):
+        cache = LRUCache(maxsize=1, ttl=5)
+        cache.put('a', 1)
+        cache.get('a')                  # hit
+        cache.get('b')                  # miss
+        cache.put('b', 2)               # evicts 'a'
+        self.clock.now += 6
+        cache.get('b')                  # expired: eviction and miss
+        loads = []
+        cache.get_or_load('c', lambda: loads.append('c') or 3)
+        cache.get_or_load('c', lambda: loads.append('c') or 3)
+        self.assertEqual(loads, ['c'])
+        self.assertEqual(cache.stats(), {'size': 1, 'maxsize': 1, 'hits': 2, 'misses': 3, 'evictions': 2})
+
+    def test_invalidate_all_clears_every_cache(self):
+        first, second = LRUCache(), LRUCache()
+        first.put('a', 1)
+        second.put('b', 2)
+        invalidate_all()
+        self.assertEqual((len(first), len(second)), (0, 0))
+
+    def test_invalidate_all_bumps_version(self):
+        conn = mock.MagicMock()
+        cache = LRUCache()
+        cache.put('a', 1)
+        invalidate_all(conn)
+        cur = conn.cursor.return_value.__enter__.return_value
+        self.assertIn('dictionary_version', cur.execute.call_args[0][0])
+        conn.commit.assert_called_once()
+        self.assertEqual(len(cache), 0)
+
+class TestVersionWatcher(unittest.TestCase):
+    def test_reports_new_versions_after_interval(self):
+        clock = FakeClock()
+        versions = [1, 1, 2]
+        reads = []
+        def read_version():
+            reads.append(clock.now)
+            return versions[len(reads) - 1]
+        with mock.patch('lookup_cache.time.monotonic', clock):
+            watcher = VersionWatcher(read_version, interval=5)
+            self.assertFalse(watcher.changed())   # first read only records the version
+            clock.now += 1
+            self.assertFalse(watcher.changed())   # within the interval: not read
+            clock.now += 5
+            self.assertFalse(watcher.changed())   # same version
+            clock.now += 5
+            self.assertTrue(watcher.changed())
+        self.assertEqual(len(reads), 3)
+
+if __name__ == '__main__':
+    unittest.main()
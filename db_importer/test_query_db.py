@@ -0,0 +1,50 @@
+import re
+import unittest
+from unittest import mock
+from lookup_cache import VersionWatcher
+from query_db import CachedJapaneseDictionary, _escape_like, _escape_regex
+
+class TestSearchPatterns(unittest.TestCase):
+    def test_escape_like(self):
+        self.assertEqual(_escape_like('100%'), '100\\%')
+        self.assertEqual(_escape_like('snake_case'), 'snake\\_case')
+        self.assertEqual(_escape_like('back\\slash'), 'back\\\\slash')
+        self.assertEqual(_escape_like('食べる eat'), '食べる eat')
+
+    def test_escape_like_escapes_backslash_first(self):
+        self.assertEqual(_escape_like('\\%'), '\\\\\\%')
+
+    def test_escape_regex(self):
+        self.assertEqual(_escape_regex('to eat (food)'), 'to eat \\(food\\)')
+        self.assertEqual(_escape_regex('a.b*c+?'), 'a\\.b\\*c\\+\\?')
+        self.assertEqual(_escape_regex('[x]{2}^$|\\'), '\\[x\\]\\{2\\}\\^\\$\\|\\\\')
+        self.assertEqual(_escape_regex('食べる'), '食べる')
+
+    def test_escaped_regex_matches_literally(self):
+        # Python and Postgres AREs agree on backslash-escaped punctuation
+        for text in ('c++', 'a.b', '(to) eat', 'what?', '$5'):
+            self.assertTrue(re.fullmatch(_escape_regex(text), text))
+        self.assertIsNone(re.fullmatch(_escape_regex('a.b'), 'axb'))
+
+class TestCachedAutocomplete(unittest.TestCase):
+    def test_rebuilds_index_when_version_changes(self):
+        versions = [1, 1, 2]
+        reads = []
+        def read_version():
+            reads.append(None)
+            return versions[len(reads) - 1]
+        dictionary = CachedJapaneseDictionary(pool=mock.MagicMock())
+        dictionary.version_watcher = VersionWatcher(read_version, interval=0)
+        with mock.patch('query_db.AutocompleteIndex.from_database',
+                        side_effect=lambda conn: mock.MagicMock()) as build:
+            dictionary.autocomplete('たべ')
+            first = dictionary.autocomplete_index
+            dictionary.autocomplete('たべ')          # same version: index reused
+            self.assertIs(dictionary.autocomplete_index, first)
+            dictionary.autocomplete('たべ')          # new version: index rebuilt
+            self.assertIsNot(dictionary.autocomplete_index, first)
+        self.assertEqual(build.call_count, 2)
+        self.assertEqual(len(reads), 3)
+
+if __name__ == '__main__':
+    unittest.main()
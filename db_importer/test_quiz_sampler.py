@@ -0,0 +1,62 @@
+import random
+import unittest
+from quiz_sampler import AliasTable, QuizSampler
+
+class TestAliasTable(unittest.TestCase):
+    def test_draws_follow_weights(self):
+        table = AliasTable([1, 3])
+        rng = random.Random(0)
+        counts = [0, 0]
+        for _ in range(20000):
+            counts[table.draw(rng)] += 1
+        self.assertAlmostEqual(counts[1] / 20000, 0.75, delta=0.02)
+
+    def test_rejects_empty_weights(self):
+        with self.assertRaises(ValueError):
+            AliasTable([])
+
+class TestQuizSampler(unittest.TestCase):
+    def setUp(self):
+        self.verbs = [
+            {'entry_id': str(i), 'verb_type': 'v1' if i % 2 else 'v5k',
+             'jlpt_level': 5 if i < 10 else 4, 'frequency': (15 - i) * 100 if i < 15 else None}
+            for i in range(40)
+        ]
+        self.sampler = QuizSampler(self.verbs, random.Random(1))
+
+    def test_sample_is_distinct(self):
+        for n in (5, 30, 40, 50):
+            ids = [v['entry_id'] for v in self.sampler.sample(n)]
+            self.assertEqual(len(ids), min(n, 40))
+            self.assertEqual(len(set(ids)), len(ids))
+
+    def test_filters(self):
+        verbs = self.sampler.sample(3, verb_type='v1', jlpt_level=5)
+        self.assertEqual(len(verbs), 3)
+        for verb in verbs:
+            self.assertEqual(verb['verb_type'], 'v1')
+            self.assertEqual(verb['jlpt_level'], 5)
+        self.assertEqual(self.sampler.sample(3, verb_type='vk'), [])
+
+    def test_frequent_verbs_come_up_more(self):
+        counts = {}
+        for _ in range(2000):
+            for verb in self.sampler.sample(1):
+                counts[verb['entry_id']] = counts.get(verb['entry_id'], 0) + 1
+        self.assertGreater(counts.get('0', 0), counts.get('39', 0))
+
+    def test_skewed_weights_finish_without_rejection_loop(self):
+        verbs = [{'entry_id': str(i), 'verb_type': 'v1', 'jlpt_level': 5,
+                  'frequency': 10 ** 9 if i < 3 else 1} for i in range(100)]
+        sampler = QuizSampler(verbs, random.Random(2))
+        rng_calls = []
+        original = sampler.rng.random
+        sampler.rng.random = lambda: rng_calls.append(1) or original()
+        ids = [v['entry_id'] for v in sampler.sample(20)]
+        self.assertEqual(len(set(ids)), 20)
+        self.assertTrue({'0', '1', '2'} <= set(ids))
+        # Rejections are capped at n, so the draw count stays linear in n
+        self.assertLess(len(rng_calls), 2 * (20 + 20 + 1) + 100)
+
+if __name__ == '__main__':
+    unittest.main()
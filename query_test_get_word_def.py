@@ -1,74 +1,88 @@
-import psycopg2
 from psycopg2.extras import RealDictCursor
+from db_importer.db_pool import get_pool
 
-def get_word_definition(word):
-    # Database connection parameters
-    db_params = {
-        "dbname": "japanese_dictionary",
-        "user": "user",
-        "password": "password",
-        "host": "localhost",
-        "port": "5432"
-    }
-
-    try:
-        # Connect to database
-        conn = psycopg2.connect(**db_params)
-        cur = conn.cursor(cursor_factory=RealDictCursor)  # Returns results as dictionaries
+# Database connection parameters
+DB_PARAMS = {
+    "dbname": "japanese_dictionary",
+    "user": "user",
+    "password": "password",
+    "host": "localhost",
+    "port": "5432"
+}
 
-        # Your query
-        query = """
-            SELECT wf.form_text, g.gloss as definition
-            FROM entries e
-            JOIN writing_forms wf ON e.id = wf.entry_id
-            JOIN senses s ON e.id = s.entry_id
-            JOIN glosses g ON s.id = g.sense_id
-            WHERE wf.form_text = %s;
-        """
-        
-        # Execute query with parameter
-        cur.execute(query, (word,))
-        results = cur.fetchall()
+DEFINITIONS_QUERY = """
+    SELECT wf.form_text, g.gloss as definition
+    FROM entries e
+    JOIN writing_forms wf ON e.id = wf.entry_id
+    JOIN senses s ON e.id = s.entry_id
+    JOIN glosses g ON s.id = g.sense_id
+    WHERE wf.form_text = ANY(%s)
+    ORDER BY wf.form_text, e.id, s.sense_order;
+"""
 
-        return results
+def get_word_definition(word):
+    try:
+        # Check out a pooled connection; results come back as dictionaries
+        with get_pool(DB_PARAMS).connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                return get_word_definitions([word], cur)[word]
 
     except Exception as e:
         print(f"Error: {e}")
         return None
 
-    finally:
-        if 'cur' in locals():
-            cur.close()
-        if 'conn' in locals():
-            conn.close()
+def get_word_definitions(words, cur):
+    """Get definitions for several words with a single query.
+    Args:
+        words: Words to look up
+        cur: RealDictCursor to run the query on
+    Returns:
+        Dict mapping each word to its list of definition rows
+    """
+    definitions = {word: [] for word in words}
+    cur.execute(DEFINITIONS_QUERY, (list(definitions),))
+    for row in cur.fetchall():
+        definitions[row['form_text']].append(row)
+    return definitions
+
+def print_definitions(chunk, cur):
+    """Resolve and print a chunk of (index, word, freq) report lines."""
+    definitions = get_word_definitions([word for _, word, _ in chunk], cur)
+    for i, word, freq in chunk:
+        print(f"\n{i+1}. {word} (Frequency: {freq})")
+        if definitions[word]:
+            for definition in definitions[word]:
+                print(f"  • {definition['definition']}")
+        else:
+            print("  No definitions found")
 
-def process_frequency_report(filename, limit=100):
+def process_frequency_report(filename, limit=100, chunk_size=500):
     """Process the word frequency report and look up definitions.
     Args:
         filename: Path to the word frequency report
         limit: Maximum number of words to process (default 100)
+        chunk_size: Number of words resolved per query (default 500)
     """
-    with open(filename, 'r', encoding='utf-8') as f:
-        for i, line in enumerate(f):
-            if i >= limit:  # Stop after processing limit words
-                break
-                
-            # Parse the line
-            parts = line.strip().split('\t')
-            if len(parts) >= 2:  # Ensure we have at least frequency and word
-                freq = parts[0]
-                word = parts[1]
-                
-                # Get definitions
-                definitions = get_word_definition(word)
+    with get_pool(DB_PARAMS).connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            with open(filename, 'r', encoding='utf-8') as f:
+                chunk = []
+                for i, line in enumerate(f):
+                    if i >= limit:  # Stop after processing limit words
+                        break
+                        
+                    # Parse the line
+                    parts = line.strip().split('\t')
+                    if len(parts) >= 2:  # Ensure we have at least frequency and word
+                        chunk.append((i, parts[1], parts[0]))
+                    
+                    # Resolve a whole chunk of words per query
+                    if len(chunk) >= chunk_size:
+                        print_definitions(chunk, cur)
+                        chunk = []
                 
-                # Print results
-                print(f"\n{i+1}. {word} (Frequency: {freq})")
-                if definitions:
-                    for definition in definitions:
-                        print(f"  • {definition['definition']}")
-                else:
-                    print("  No definitions found")
+                if chunk:
+                    print_definitions(chunk, cur)
 
 if __name__ == "__main__":
     report_file = "db_importer/word_frequency_report.txt"
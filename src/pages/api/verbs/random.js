@@ -1,50 +1,84 @@
 // pages/api/verbs/random.js
 const db = require('../../../lib/db');
 
+const QUIZ_SIZE = 20;
+// Rounds of weighted point lookups before the rest is drawn in a single sorted query
+const MAX_ROUNDS = 3;
+
+// The verb whose cumulative_weight range contains each point, in point order
+const POINT_QUERY = `
+  SELECT q.slot
+  FROM unnest($1::float8[]) WITH ORDINALITY AS p(point, n)
+  CROSS JOIN LATERAL (
+    SELECT slot FROM quiz_verbs
+    WHERE cumulative_weight > p.point
+    ORDER BY cumulative_weight
+    LIMIT 1
+  ) q
+  ORDER BY p.n
+`;
+
+// Weighted sampling without replacement (Efraimidis-Spirakis) over the verbs not yet chosen
+const REMAINDER_QUERY = `
+  SELECT slot FROM quiz_verbs
+  WHERE slot <> ALL($1::int[])
+  ORDER BY -ln(1 - random()) / weight
+  LIMIT $2
+`;
+
+// Pick `count` distinct slots, each verb as likely as its corpus frequency
+async function weightedSlots(count, totalWeight) {
+  const slots = new Set();
+  for (let round = 0; round < MAX_ROUNDS && slots.size < count; round++) {
+    const points = Array.from({ length: 2 * (count - slots.size) }, () => Math.random() * totalWeight);
+    const rows = await db.any(POINT_QUERY, [points]);
+    for (const { slot } of rows) {
+      if (slots.size < count) {
+        slots.add(slot);
+      }
+    }
+  }
+  // A few very frequent verbs keep coming up again; draw the rest without replacement
+  if (slots.size < count) {
+    const rows = await db.any(REMAINDER_QUERY, [Array.from(slots), count - slots.size]);
+    rows.forEach(({ slot }) => slots.add(slot));
+  }
+  return Array.from(slots);
+}
+
 export default async function handler(req, res) {
   if (req.method !== 'GET') {
     return res.status(405).json({ message: 'Method not allowed' });
   }
 
   try {
-    // Query to get random common verbs with their conjugations
-    const query = `
-      WITH random_verbs AS (
-        SELECT DISTINCT e.id, 
-               wf.form_text as dictionary_form,
-               wf.form_type,
-               sp.pos as verb_type
-        FROM entries e
-        JOIN writing_forms wf ON e.id = wf.entry_id
-        JOIN senses s ON e.id = s.entry_id
-        JOIN sense_pos sp ON s.id = sp.sense_id
-        WHERE sp.pos LIKE 'v%'
-        AND wf.is_common = true
-        ORDER BY RANDOM()
-        LIMIT 20
-      )
-      SELECT rv.*,
-             c.form as conjugation_form,
-             c.kanji as conjugated_kanji,
-             c.kana as conjugated_kana
-      FROM random_verbs rv
-      JOIN conjugations c ON rv.id = c.entry_id
-      WHERE c.form = 'te_form'
-      ORDER BY rv.dictionary_form;
-    `;
-
-    const result = await db.query(query);
-    
-    const verbs = result.rows.map(row => ({
-      id: row.id,
+    // quiz_verbs is rebuilt by the Python importer with dense slots 1..N and a
+    // running total of verb weights, so verbs are picked by weight with index
+    // lookups instead of sorting the whole table
+    const { total, totalWeight } = await db.one(`
+      SELECT COALESCE(MAX(slot), 0) AS total, COALESCE(MAX(cumulative_weight), 0) AS "totalWeight"
+      FROM quiz_verbs
+    `);
+    const count = Math.min(QUIZ_SIZE, total);
+    const slots = count === 0 ? [] : await weightedSlots(count, totalWeight);
+
+    const rows = slots.length === 0 ? [] : await db.any(`
+      SELECT entry_id, kanji, kana, verb_type, te_kanji, te_kana
+      FROM quiz_verbs
+      WHERE slot = ANY($1::int[])
+      ORDER BY kana
+    `, [slots]);
+
+    const verbs = rows.map(row => ({
+      id: row.entry_id,
       dictionaryForm: {
-        kanji: row.form_type === 'kanji' ? row.dictionary_form : '',
-        kana: row.form_type === 'kana' ? row.dictionary_form : ''
+        kanji: row.kanji || '',
+        kana: row.kana
       },
       verbType: row.verb_type,
       teForm: {
-        kanji: row.conjugated_kanji,
-        kana: row.conjugated_kana
+        kanji: row.te_kanji,
+        kana: row.te_kana
       }
     }));
 